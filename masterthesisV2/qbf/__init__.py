@@ -0,0 +1 @@
+# Shared code of the tests in masterthesisV2.
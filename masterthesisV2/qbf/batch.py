@@ -0,0 +1,111 @@
+import multiprocessing  # This package provides processes and pipes between them.
+import multiprocessing.connection  # This package provides waiting on several pipes at once.
+import os  # This package provides access to the operating system.
+import resource  # This package provides resource limits of processes.
+import shutil  # This package provides removing of directory trees.
+import signal  # This package provides signals.
+import tempfile  # This package provides unique temporary directories.
+import time  # This package provides access to the system time.
+import traceback  # This package provides formatted exceptions.
+
+
+class Result:  # The class Result holds the outcome of one instance of a batch.
+    def __init__(self, status, value=None, message="", time=0.0):
+        self.status = status  # "ok", "timeout", "memory" or "error".
+        self.value = value  # Return value of the function if status is "ok".
+        self.message = message
+        self.time = time  # Wall clock time of the instance in seconds.
+
+    def ok(self):
+        return self.status == "ok"
+
+
+def run_instance(connection, function, arguments, directory, memory_limit):
+    # Method that runs in the child process of one instance. The child gets its own process group, so that external
+    # tools started by the instance are killed together with it.
+    os.setpgrp()
+    if memory_limit is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    try:
+        result = Result("ok", function(directory, *arguments))
+    except MemoryError:
+        result = Result("memory", message="memory limit exceeded")
+    except Exception:
+        result = Result("error", message=traceback.format_exc())
+    connection.send(result)
+    connection.close()
+
+
+def kill(process):  # Method that kills the process group of an instance.
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:  # The process did not create its group yet.
+        process.kill()
+    process.join()
+
+
+def run(function, instances, processes=None, timeout=None, memory_limit=None, work_directory=None,
+        keep_artifacts=False, callback=None):
+    # Method that calls function(directory, *arguments) for each tuple of arguments in instances with at most
+    # processes instances at the same time. Every instance gets a new directory for its intermediate files in
+    # work_directory (default: the system temporary directory), which is removed afterwards unless keep_artifacts
+    # is set. An instance is killed after timeout seconds, memory_limit limits its address space in bytes. The
+    # results are returned in the order of instances, and callback(index, result) is called as soon as an instance
+    # is done, so finished results can be saved before the whole batch is done.
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if work_directory is not None:
+        os.makedirs(work_directory, exist_ok=True)
+    results = [None] * len(instances)
+    running = {}  # Maps the receiving pipe end to (index, process, directory, start time).
+    next_index = 0
+
+    while next_index < len(instances) or running:
+        # Start new instances while there are free processes.
+        while next_index < len(instances) and len(running) < processes:
+            arguments = tuple(instances[next_index])
+            prefix = str(next_index) + "_" + "_".join(map(str, arguments))[:40] + "_"
+            directory = tempfile.mkdtemp(prefix=prefix.replace("/", "_"), dir=work_directory)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=run_instance,
+                                              args=(sender, function, arguments, directory, memory_limit))
+            process.start()
+            sender.close()
+            running[receiver] = (next_index, process, directory, time.monotonic())
+            next_index += 1
+
+        # Wait until an instance finishes or the next timeout is reached.
+        wait_time = None
+        if timeout is not None:
+            now = time.monotonic()
+            wait_time = max(0.0, min(start + timeout - now for _, _, _, start in running.values()))
+        ready = multiprocessing.connection.wait(list(running), wait_time)
+
+        now = time.monotonic()
+        for receiver in list(running):
+            index, process, directory, start = running[receiver]
+            if receiver in ready:
+                try:
+                    result = receiver.recv()
+                except EOFError:  # The process ended without a result, for example killed by the system.
+                    process.join()  # The exit code is only known after the join.
+                    if process.exitcode < 0:
+                        message = "process killed by signal " + str(-process.exitcode)
+                    else:
+                        message = "process ended with exit code " + str(process.exitcode)
+                    result = Result("error", message=message)
+                process.join()
+            elif timeout is not None and now - start >= timeout:
+                kill(process)
+                result = Result("timeout", message="timeout after " + str(timeout) + " s")
+            else:
+                continue
+            result.time = now - start
+            results[index] = result
+            if callback is not None:
+                callback(index, result)
+            receiver.close()
+            del running[receiver]
+            if not keep_artifacts:
+                shutil.rmtree(directory, ignore_errors=True)
+    return results
@@ -0,0 +1,166 @@
+import math  # This package provides the square root.
+import multiprocessing  # This package runs the measurements on pinned cores.
+import os  # This package provides posix_spawn, wait4 and the cpu affinity.
+import signal  # This package provides the signal to stop a run after its timeout.
+import statistics  # This package provides the median, the standard deviation and the normal distribution.
+import threading  # This package provides the timer of the timeout.
+import time  # This package provides the wall clock.
+
+
+class Run:  # The class Run is one run of a program.
+    def __init__(self, wall, cpu, exit_code, timed_out):
+        self.wall = wall  # Wall time in seconds from the start of the process to its end.
+        self.cpu = cpu  # User and system time of the process in seconds, measured by wait4.
+        self.exit_code = exit_code  # Exit code of the process, -n if it was stopped by signal n.
+        self.timed_out = timed_out
+
+
+class Summary:  # The class Summary describes a sample of run times.
+    def __init__(self, values, confidence):
+        self.runs = len(values)
+        self.mean = statistics.mean(values) if values else None
+        self.median = statistics.median(values) if values else None
+        self.stddev = statistics.stdev(values) if len(values) > 1 else None
+        self.ci_low = None
+        self.ci_high = None
+        if len(values) > 1:
+            half_width = t_quantile(confidence, len(values) - 1) * self.stddev / math.sqrt(len(values))
+            self.ci_low = self.mean - half_width
+            self.ci_high = self.mean + half_width
+
+    def relative_half_width(self):  # Returns half the width of the confidence interval relative to the mean.
+        if self.ci_low is None:
+            return math.inf
+        if self.mean == 0:
+            return 0.0
+        return (self.ci_high - self.ci_low) / 2 / self.mean
+
+    def to_dict(self):
+        return {"runs": self.runs, "mean": self.mean, "median": self.median, "stddev": self.stddev,
+                "ci_low": self.ci_low, "ci_high": self.ci_high}
+
+
+class Measurement:  # The class Measurement is the result of measure: the warmup runs and the measured runs.
+    def __init__(self, warmups, runs, confidence, metric):
+        self.warmups = warmups
+        self.runs = runs
+        self.confidence = confidence
+        self.metric = metric  # "cpu" or "wall", the time that decided when the sampling stopped.
+
+    def timed_out(self):
+        for run in self.warmups + self.runs:
+            if run.timed_out:
+                return True
+        return False
+
+    def wall(self):
+        return Summary([run.wall for run in self.runs], self.confidence)
+
+    def cpu(self):
+        return Summary([run.cpu for run in self.runs], self.confidence)
+
+    def to_dict(self):
+        exit_codes = sorted(set(run.exit_code for run in self.warmups + self.runs))
+        return {"warmups": len(self.warmups), "confidence": self.confidence, "metric": self.metric,
+                "timed_out": self.timed_out(), "exit_codes": exit_codes, "wall": self.wall().to_dict(),
+                "cpu": self.cpu().to_dict()}
+
+
+def t_quantile(confidence, degrees_of_freedom):
+    # Method that returns the two-sided quantile of the Student t distribution, computed from the normal quantile by
+    # the Cornish-Fisher expansion (exact to about 1% from 3 degrees of freedom on).
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    v = degrees_of_freedom
+    return (z + (z ** 3 + z) / (4 * v) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3))
+
+
+def run_once(command, output=None, timeout=None):
+    # Method that starts a program directly (without a shell) and waits for it. Its output is written to the file
+    # output or dropped. The cpu time is taken from the resource usage that wait4 returns for exactly this process.
+    path_output = os.devnull if output is None else output
+    file_actions = [(os.POSIX_SPAWN_OPEN, 1, path_output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)]
+    timed_out = []
+    # The timer may only kill the process as long as it is not reaped, afterwards its pid can belong to another
+    # process. So the end of the process is awaited without reaping it (WNOWAIT), then reaped is set under the lock.
+    lock = threading.Lock()
+    reaped = []
+    start = time.perf_counter()
+    pid = os.posix_spawn(command[0], command, os.environ, file_actions=file_actions)
+    timer = None
+    if timeout is not None:
+        def stop():
+            with lock:
+                if reaped:
+                    return
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    return
+                timed_out.append(True)
+        timer = threading.Timer(timeout, stop)
+        timer.start()
+    os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+    wall = time.perf_counter() - start
+    with lock:
+        reaped.append(True)
+    if timer is not None:
+        timer.cancel()
+    _, status, usage = os.wait4(pid, 0)
+    return Run(wall, usage.ru_utime + usage.ru_stime, os.waitstatus_to_exitcode(status), len(timed_out) > 0)
+
+
+def measure(command, warmups=1, min_runs=5, max_runs=50, target=0.02, confidence=0.95, metric="cpu", timeout=None,
+            max_time=None):
+    # Method that runs a program warmups times without measuring and then at least min_runs and at most max_runs
+    # times, until the confidence interval of the mean of metric is at most target (relative to the mean) on each
+    # side or max_time seconds were spent. A run that exceeds timeout stops the measurement.
+    warmup_runs = []
+    for _ in range(warmups):
+        warmup_runs.append(run_once(command, timeout=timeout))
+        if warmup_runs[-1].timed_out:
+            return Measurement(warmup_runs, [], confidence, metric)
+    runs = []
+    start = time.perf_counter()
+    while len(runs) < max_runs:
+        runs.append(run_once(command, timeout=timeout))
+        if runs[-1].timed_out:
+            break
+        if len(runs) >= min_runs:
+            values = [getattr(run, metric) for run in runs]
+            if Summary(values, confidence).relative_half_width() <= target:
+                break
+        if max_time is not None and time.perf_counter() - start > max_time:
+            break
+    return Measurement(warmup_runs, runs, confidence, metric)
+
+
+def pin(cores):  # Method that pins the current process to the next free core of the queue cores.
+    os.sched_setaffinity(0, {cores.get()})
+
+
+def call(arguments):  # Method that calls arguments[0] with the other arguments (for Pool.imap).
+    return arguments[0](*arguments[1:])
+
+
+def run_jobs(function, jobs, cores=None, callback=None):
+    # Method that calls function(*job) for every job and returns the results in the order of jobs. callback(index,
+    # result) is called for every result in this order as soon as it is available. If cores is a list of cpu numbers,
+    # the jobs run in parallel in one process per core, each pinned to its core, so the measured programs (which
+    # inherit the affinity) do not move between cores. None runs the jobs one after another in this process.
+    results = []
+    if cores is None:
+        for job in jobs:
+            results.append(function(*job))
+            if callback is not None:
+                callback(len(results) - 1, results[-1])
+        return results
+    queue = multiprocessing.Queue()
+    for core in cores:
+        queue.put(core)
+    with multiprocessing.Pool(len(cores), pin, (queue,)) as pool:
+        for result in pool.imap(call, [(function,) + tuple(job) for job in jobs]):
+            results.append(result)
+            if callback is not None:
+                callback(len(results) - 1, result)
+    return results
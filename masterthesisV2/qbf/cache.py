@@ -0,0 +1,108 @@
+import hashlib  # This package provides hash functions.
+import os  # This package provides access to the operating system.
+import shutil  # This package provides copying and removing of files.
+import tempfile  # This package provides unique temporary files.
+
+BLOCK_SIZE = 1 << 20  # Number of bytes that are hashed at once.
+
+tool_digests = {}  # Digests of tool executables, computed once per process.
+
+
+def file_digest(path):  # Method that returns the sha256 digest of the content of a file.
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        block = file.read(BLOCK_SIZE)
+        while block:
+            digest.update(block)
+            block = file.read(BLOCK_SIZE)
+    return digest.hexdigest()
+
+
+def tool_digest(path):
+    # Method that returns the digest of an executable as its version. A missing tool gets the digest "missing".
+    if path not in tool_digests:
+        if os.path.isfile(path):
+            tool_digests[path] = file_digest(path)
+        else:
+            tool_digests[path] = "missing"
+    return tool_digests[path]
+
+
+def get_key(*parts):  # Method that combines strings (for example digests and parameters) into one key.
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Cache:  # The class Cache is a content-addressed file store with size-based LRU eviction.
+    def __init__(self, directory, max_size):
+        # Every entry is a directory directory/<key[:2]>/<key> with the files of the entry. The modification time
+        # of the entry directory is the time of its last use. max_size is the size of all entries in bytes.
+        self.directory = directory
+        self.max_size = max_size
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def entry(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key, name):  # Method that returns the path of a cached file, or None.
+        if self.directory is None:
+            return None
+        path = os.path.join(self.entry(key), name)
+        if not os.path.isfile(path):
+            return None
+        try:
+            os.utime(self.entry(key))
+        except FileNotFoundError:  # The entry was evicted by another process in the meantime.
+            return None
+        return path
+
+    def put(self, key, name, source):  # Method that copies a file into the cache and returns its new path.
+        if self.directory is None:
+            return source
+        entry = self.entry(key)
+        os.makedirs(entry, exist_ok=True)
+        path = os.path.join(entry, name)
+        # The file is copied under a temporary name first, so other processes never see a partial file.
+        handle, temporary = tempfile.mkstemp(dir=entry)
+        os.close(handle)
+        shutil.copyfile(source, temporary)
+        os.replace(temporary, path)
+        os.utime(entry)
+        self.evict(key)
+        return path
+
+    def get_file(self, key, name, directory, create):
+        # Method that returns the path of the file name of entry key. On a miss create(path) is called to write the
+        # file to directory, and the file is added to the cache.
+        path = self.get(key, name)
+        if path is None:
+            path = os.path.join(directory, name)
+            create(path)
+            path = self.put(key, name, path)
+        return path
+
+    def evict(self, keep=None):  # Method that removes the least recently used entries until the cache fits.
+        entries = []
+        size = 0
+        for prefix in os.listdir(self.directory):
+            for key in os.listdir(os.path.join(self.directory, prefix)):
+                entry = os.path.join(self.directory, prefix, key)
+                try:
+                    entry_size = 0
+                    for name in os.listdir(entry):
+                        entry_size += os.path.getsize(os.path.join(entry, name))
+                    entries.append((os.path.getmtime(entry), entry_size, key, entry))
+                except FileNotFoundError:
+                    continue
+                size += entry_size
+        entries.sort()
+        for _, entry_size, key, entry in entries:
+            if size <= self.max_size:
+                break
+            if key != keep:
+                shutil.rmtree(entry, ignore_errors=True)
+                size -= entry_size
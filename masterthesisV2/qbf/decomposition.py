@@ -0,0 +1,250 @@
+class Node:  # The class Node is a own tree decomposition node implementation.
+    # Only integer ids are stored: bag_x is a frozenset of variable numbers i (for x_i) and bag_c maps every clause
+    # number i of the bag to the node number j of its c_i_j variable. The literals of a clause are never copied into
+    # a node, they are looked up in the shared clause list. __slots__ avoids an attribute dictionary per node.
+    # introduced and forgotten are filled by the pass Tables.
+    __slots__ = ("number", "parent", "children", "bag_x", "bag_c", "introduced", "forgotten")
+
+    def __init__(self, number, bag_x, bag_c, parent=None):
+        self.number = number
+        self.parent = parent
+        self.children = []
+        self.bag_x = bag_x
+        self.bag_c = {}
+        for clause_number in bag_c:
+            self.bag_c[clause_number] = number
+        self.introduced = None
+        self.forgotten = None
+
+    def is_root(self):
+        return self.parent is None
+
+    def clone(self, number, parent=None):  # Method that returns a new node with the same bag.
+        return Node(number, self.bag_x, self.bag_c, parent)
+
+    def get_variable(self, clause_number):  # Returns the node number j of c_i_j for clause i, or None.
+        return self.bag_c.get(clause_number)
+
+    def width(self):  # Returns the width of the subtree of this node.
+        width = Width()
+        sweep(self, [width])
+        return width.width
+
+
+class Tables:  # The class Tables is a pass of the sweep that precomputes the introduce and forget tables of the nodes.
+    def __init__(self, clauses):
+        self.clauses = clauses
+
+    def visit(self, node):
+        # introduced maps every clause number of the bag to the literals of the clause whose variables are in the bag
+        # of the node but not in the bag of a child that contains the clause. Every literal is introduced in the
+        # lowest nodes that contain both the clause and its variable. forgotten is the set of clause numbers of the bag
+        # that are not in the bag of the parent, i.e. whose clause variable is closed in this node.
+        introduced = {}
+        for clause_number in node.bag_c:
+            bags_x = []
+            for child in node.children:
+                if clause_number in child.bag_c:
+                    bags_x.append(child.bag_x)
+            literals = []
+            for literal in self.clauses[clause_number - 1]:
+                variable = abs(literal)
+                if variable in node.bag_x:
+                    for bag_x in bags_x:
+                        if variable in bag_x:
+                            break
+                    else:
+                        literals.append(literal)
+            introduced[clause_number] = literals
+        node.introduced = introduced
+        if node.parent is None:
+            node.forgotten = frozenset(node.bag_c)
+        else:
+            node.forgotten = frozenset(node.bag_c.keys() - node.parent.bag_c.keys())
+
+
+class Depth:  # The class Depth is a pass of the sweep that computes the depth of the tree decomposition.
+    def __init__(self):
+        self.heights = {}
+        self.depth = -1
+
+    def visit(self, node):
+        height = 0
+        for child in node.children:
+            height = max(height, self.heights.pop(child.number) + 1)
+        self.heights[node.number] = height
+        self.depth = height  # The root is visited last.
+
+
+class Width:  # The class Width is a pass of the sweep that computes the width of the tree decomposition.
+    def __init__(self):
+        self.width = -1
+
+    def visit(self, node):
+        width = len(node.bag_x) + len(node.bag_c) - 1
+        if width > self.width:
+            self.width = width
+
+
+def post_order(root):
+    # Method that returns the nodes of the subtree of root in post order, i.e. every node comes after all of its
+    # descendants. An explicit stack is used, so the depth of the tree is not limited by the recursion limit.
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(node.children)
+    order.reverse()
+    return order
+
+
+def sweep(root, passes):
+    # Method that visits each node of the subtree of root once in post order and calls visit(node) of every pass on
+    # it, so several computations need only one traversal.
+    for node in post_order(root):
+        for current_pass in passes:
+            current_pass.visit(node)
+
+
+def split_bag(bag):
+    # Method that splits a bag of node labels (v for x_v and -i for c_i) into variable and clause numbers.
+    bag_x = []
+    bag_c = []
+    for label in bag:
+        if label < 0:
+            bag_c.append(-label)
+        else:
+            bag_x.append(label)
+    return frozenset(bag_x), bag_c
+
+
+# Strategies to choose the root of the tree decomposition: the first bag, a center of the tree (smallest depth), the
+# bag with the most clause variables or the bag with the smallest cost in the cost model of root_costs.
+ROOT_FIRST = "first"
+ROOT_CENTER = "center"
+ROOT_CLAUSES = "clauses"
+ROOT_COST = "cost"
+ROOT_STRATEGIES = [ROOT_FIRST, ROOT_CENTER, ROOT_CLAUSES, ROOT_COST]
+
+
+def get_adjacency(number_of_nodes, edges):  # Method that returns the list of neighbours of every node.
+    adjacency = []
+    for _ in range(number_of_nodes):
+        adjacency.append([])
+    for edge in edges:
+        adjacency[edge[0]].append(edge[1])
+        adjacency[edge[1]].append(edge[0])
+    return adjacency
+
+
+def get_distances(adjacency, start):
+    # Method that returns the distance of every node to start (-1 if it can not be reached) and the nodes in the order
+    # of a breadth-first search.
+    distances = [-1] * len(adjacency)
+    distances[start] = 0
+    order = [start]
+    for index in order:
+        for neighbour in adjacency[index]:
+            if distances[neighbour] == -1:
+                distances[neighbour] = distances[index] + 1
+                order.append(neighbour)
+    return distances, order
+
+
+def get_eccentricities(adjacency):
+    # Method that returns the eccentricity of every node, i.e. the depth of the tree if it is the root. In a tree the
+    # farthest node of every node is one of the two ends of a longest path, so three searches are enough.
+    distances, order = get_distances(adjacency, 0)
+    distances_a, order = get_distances(adjacency, order[-1])
+    distances_b, _ = get_distances(adjacency, order[-1])
+    eccentricities = []
+    for i in range(len(adjacency)):
+        eccentricities.append(max(distances_a[i], distances_b[i]))
+    return eccentricities
+
+
+def get_clones(number_of_children):  # Method that returns the number of clones normalize adds to a node.
+    if number_of_children <= 2:
+        return 0
+    if number_of_children == 3:
+        return 1
+    half = number_of_children // 2
+    return 2 + get_clones(half) + get_clones(number_of_children - half)
+
+
+def root_costs(nodes, adjacency):
+    # Method that returns the cost of every node as root. Every clause of a bag becomes one auxiliary variable per
+    # node, and apart from the root the number of children of a node does not depend on the root. So the root only
+    # changes the number of clones of itself, which add len(bag_c) auxiliary variables each. Ties are broken by the
+    # depth of the tree.
+    eccentricities = get_eccentricities(adjacency)
+    costs = []
+    for i in range(len(nodes)):
+        degree = len(adjacency[i])
+        extra = (get_clones(degree) - get_clones(degree - 1)) * len(nodes[i].bag_c)
+        costs.append((extra, eccentricities[i]))
+    return costs
+
+
+def choose_root(nodes, adjacency, root_strategy):  # Method that returns the index of the root for a strategy.
+    if root_strategy == ROOT_FIRST or len(nodes) == 1:
+        return 0
+    if root_strategy == ROOT_CENTER:
+        keys = get_eccentricities(adjacency)
+    elif root_strategy == ROOT_CLAUSES:
+        keys = [-len(node.bag_c) for node in nodes]
+    elif root_strategy == ROOT_COST:
+        keys = root_costs(nodes, adjacency)
+    else:
+        raise ValueError("unknown root strategy " + str(root_strategy))
+    return min(range(len(nodes)), key=keys.__getitem__)
+
+
+def get_nodes(bags, edges, root_strategy=ROOT_FIRST):
+    # Method that transfers a given tree decomposition into a own data structure using the class Node and returns
+    # the root and the list of all nodes. The tree is built from the lists of neighbours in linear time.
+    nodes = []
+    for i in range(len(bags)):
+        bag_x, bag_c = split_bag(bags[i])
+        nodes.append(Node(i + 1, bag_x, bag_c))
+    adjacency = get_adjacency(len(nodes), edges)
+    index = choose_root(nodes, adjacency, root_strategy)
+    _, order = get_distances(adjacency, index)
+    for index in order:
+        node = nodes[index]
+        for neighbour in adjacency[index]:
+            if nodes[neighbour] is not node.parent:
+                node.children.append(nodes[neighbour])
+                nodes[neighbour].parent = node
+    return nodes[order[0]], nodes
+
+
+def normalize(root, nodes):
+    # Normalize the tree decomposition so that each node has only two children at most.
+    queue = [root]
+    while queue:
+        node = queue.pop()
+        size = len(node.children)
+        if size == 3:
+            clone = node.clone(len(nodes) + 1, node)
+            nodes.append(clone)
+            clone.children.append(node.children[0])
+            node.children[0].parent = clone
+            clone.children.append(node.children[1])
+            node.children[1].parent = clone
+            node.children = [clone, node.children[2]]
+        elif size > 3:
+            clone1 = node.clone(len(nodes) + 1, node)
+            nodes.append(clone1)
+            clone2 = node.clone(len(nodes) + 1, node)
+            nodes.append(clone2)
+            for child in node.children[:size // 2]:
+                clone1.children.append(child)
+                child.parent = clone1
+            for child in node.children[size // 2:]:
+                clone2.children.append(child)
+                child.parent = clone2
+            node.children = [clone1, clone2]
+        queue.extend(node.children)
+    return root
@@ -0,0 +1,235 @@
+import heapq  # This package provides the priority queues of the heuristics.
+import random  # This package provides the random tie-breaks.
+
+# Heuristics for the elimination ordering: eliminate a node of minimal degree, eliminate a node that adds the fewest
+# fill edges, or eliminate the nodes in the reverse order of a maximum cardinality search.
+MIN_DEGREE = "min-degree"
+MIN_FILL = "min-fill"
+MCS = "mcs"
+HEURISTICS = [MIN_DEGREE, MIN_FILL, MCS]
+
+
+def get_adjacency(graph):  # Method that returns the neighbours of every node of a graphs.Graph as sets.
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    adjacency = []
+    for node in range(graph.number_of_nodes()):
+        adjacency.append(set(indices[indptr[node]:indptr[node + 1]]))
+    return adjacency
+
+
+def get_tie_breaks(number_of_nodes, seed):
+    # Method that returns the tie-break of every node: the node number itself for seed 0 and a random permutation of
+    # the node numbers otherwise.
+    tie_breaks = list(range(number_of_nodes))
+    if seed != 0:
+        random.Random(seed).shuffle(tie_breaks)
+    return tie_breaks
+
+
+def eliminate(adjacency, node):
+    # Method that removes a node from the graph and makes its neighbours a clique. It returns the neighbours and the
+    # added fill edges.
+    neighbours = adjacency[node]
+    adjacency[node] = None
+    fill_edges = []
+    for neighbour in neighbours:
+        current = adjacency[neighbour]
+        current.discard(node)
+        for other in neighbours:
+            if other > neighbour and other not in current:
+                fill_edges.append((neighbour, other))
+    for neighbour, other in fill_edges:
+        adjacency[neighbour].add(other)
+        adjacency[other].add(neighbour)
+    return neighbours, fill_edges
+
+
+def get_fill(adjacency, node):  # Method that returns the number of fill edges that eliminating a node would add.
+    neighbours = adjacency[node]
+    degree = len(neighbours)
+    adjacent_pairs = 0
+    for neighbour in neighbours:
+        adjacent_pairs += len(adjacency[neighbour] & neighbours)
+    return (degree * (degree - 1) - adjacent_pairs) // 2
+
+
+def min_degree(adjacency, tie_breaks):
+    # Method that eliminates all nodes, always a node of minimal degree. The priority queue contains outdated entries,
+    # which are skipped when their degree does not match the current degree anymore. It returns the elimination order
+    # and the neighbours of every node when it was eliminated.
+    queue = []
+    for node in range(len(adjacency)):
+        queue.append((len(adjacency[node]), tie_breaks[node], node))
+    heapq.heapify(queue)
+    order = []
+    neighbourhoods = [None] * len(adjacency)
+    while queue:
+        degree, _, node = heapq.heappop(queue)
+        if adjacency[node] is None or degree != len(adjacency[node]):
+            continue
+        neighbours, _ = eliminate(adjacency, node)
+        order.append(node)
+        neighbourhoods[node] = neighbours
+        for neighbour in neighbours:
+            heapq.heappush(queue, (len(adjacency[neighbour]), tie_breaks[neighbour], neighbour))
+    return order, neighbourhoods
+
+
+def min_fill(adjacency, tie_breaks):
+    # Method that eliminates all nodes, always a node that adds the fewest fill edges (ties are broken by the degree).
+    # The fill of the neighbours of an eliminated node is computed again. Every other node only loses one missing
+    # edge for each fill edge between two of its neighbours.
+    fills = []
+    queue = []
+    for node in range(len(adjacency)):
+        fills.append(get_fill(adjacency, node))
+        queue.append((fills[node], len(adjacency[node]), tie_breaks[node], node))
+    heapq.heapify(queue)
+    order = []
+    neighbourhoods = [None] * len(adjacency)
+    while queue:
+        fill, degree, _, node = heapq.heappop(queue)
+        if adjacency[node] is None or fill != fills[node] or degree != len(adjacency[node]):
+            continue
+        neighbours, fill_edges = eliminate(adjacency, node)
+        order.append(node)
+        neighbourhoods[node] = neighbours
+        changed = set()
+        for neighbour, other in fill_edges:
+            for common in adjacency[neighbour] & adjacency[other]:
+                if common not in neighbours:
+                    fills[common] -= 1
+                    changed.add(common)
+        for neighbour in neighbours:
+            fills[neighbour] = get_fill(adjacency, neighbour)
+            changed.add(neighbour)
+        for current in changed:
+            heapq.heappush(queue, (fills[current], len(adjacency[current]), tie_breaks[current], current))
+    return order, neighbourhoods
+
+
+def mcs(adjacency, tie_breaks):
+    # Method that visits all nodes, always a node with the most visited neighbours (maximum cardinality search), and
+    # eliminates them in the reverse order of the visits.
+    weights = [0] * len(adjacency)
+    visited = [False] * len(adjacency)
+    queue = []
+    for node in range(len(adjacency)):
+        queue.append((0, tie_breaks[node], node))
+    heapq.heapify(queue)
+    visits = []
+    while queue:
+        weight, _, node = heapq.heappop(queue)
+        if visited[node] or -weight != weights[node]:
+            continue
+        visited[node] = True
+        visits.append(node)
+        for neighbour in adjacency[node]:
+            if not visited[neighbour]:
+                weights[neighbour] += 1
+                heapq.heappush(queue, (-weights[neighbour], tie_breaks[neighbour], neighbour))
+    visits.reverse()
+    neighbourhoods = [None] * len(adjacency)
+    for node in visits:
+        neighbourhoods[node], _ = eliminate(adjacency, node)
+    return visits, neighbourhoods
+
+
+def get_bags(order, neighbourhoods):
+    # Method that builds the tree decomposition of an elimination order. The bag of a node is the node with its
+    # neighbours when it was eliminated, and its parent is the neighbour that was eliminated first. A bag that
+    # contains the whole bag of its parent replaces it (at most once per parent, so the width does not grow), the
+    # roots of several components are joined to a path. It returns the bags as lists of node numbers, the edges
+    # between the bag indices and the width.
+    positions = [0] * len(order)
+    for position in range(len(order)):
+        positions[order[position]] = position
+    bags = [None] * len(order)
+    parents = [None] * len(order)
+    owners = list(range(len(order)))  # owners[node] is the node whose bag contains the bag of node.
+    absorbed = [False] * len(order)
+    for node in order:
+        neighbours = neighbourhoods[node]
+        bag = bags[node]
+        if bag is None:
+            bag = [node]
+            bag.extend(neighbours)
+        if neighbours:
+            parent = min(neighbours, key=positions.__getitem__)
+            parents[node] = parent
+            if not absorbed[parent] and len(neighbourhoods[parent]) == len(neighbours) - 1:
+                bags[parent] = bag
+                absorbed[parent] = True
+                owners[node] = parent
+                continue
+        bags[node] = bag
+
+    def owner(node):
+        while owners[node] != node:
+            owners[node] = owners[owners[node]]
+            node = owners[node]
+        return node
+
+    indices = {}
+    result = []
+    width = -1
+    for node in order:
+        if owners[node] == node:
+            indices[node] = len(result)
+            result.append(bags[node])
+            width = max(width, len(bags[node]) - 1)
+    edges = []
+    root = None
+    for node in order:
+        if owners[node] != node:
+            continue
+        if parents[node] is not None:
+            edges.append((indices[node], indices[owner(parents[node])]))
+        elif root is None:
+            root = node
+        else:
+            edges.append((indices[root], indices[node]))
+            root = node
+    return result, edges, width
+
+
+def run_heuristic(graph, heuristic, seed):
+    # Method that computes a tree decomposition of a graphs.Graph with one heuristic and one tie-break seed.
+    adjacency = get_adjacency(graph)
+    tie_breaks = get_tie_breaks(len(adjacency), seed)
+    if heuristic == MIN_DEGREE:
+        order, neighbourhoods = min_degree(adjacency, tie_breaks)
+    elif heuristic == MIN_FILL:
+        order, neighbourhoods = min_fill(adjacency, tie_breaks)
+    elif heuristic == MCS:
+        order, neighbourhoods = mcs(adjacency, tie_breaks)
+    else:
+        raise ValueError("unknown heuristic " + str(heuristic))
+    return get_bags(order, neighbourhoods)
+
+
+def get_tree_decompositions(graph, heuristics=None, seeds=1, processes=1):
+    # Method that runs every heuristic with the tie-break seeds 0, ..., seeds - 1 (0 breaks ties by node number) and
+    # returns the tree decompositions (bags, edges, width) of all runs in this order. The runs are done in processes
+    # parallel processes, None means one per cpu core. The bags are lists of node numbers of the graph.
+    if heuristics is None:
+        heuristics = HEURISTICS
+    runs = []
+    for heuristic in heuristics:
+        for seed in range(seeds):
+            runs.append((graph, heuristic, seed))
+    if graph.number_of_nodes() == 0:
+        return [([], [], -1) for _ in runs]
+    if processes == 1 or len(runs) == 1:
+        return [run_heuristic(*run) for run in runs]
+    import multiprocessing  # multiprocessing is only imported if the heuristics run in parallel.
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(run_heuristic, runs)
+
+
+def get_tree_decomposition(graph, heuristics=None, seeds=1, processes=1):
+    # Method that returns the tree decomposition of get_tree_decompositions with the smallest width, with the fewest
+    # bags among them.
+    results = get_tree_decompositions(graph, heuristics, seeds, processes)
+    return min(results, key=lambda result: (result[2], len(result[0])))
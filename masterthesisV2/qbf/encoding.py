@@ -0,0 +1,132 @@
+from . import decomposition  # This package provides the tree decomposition data structure.
+
+
+class Formula:  # The class Formula represents a formula in cnf with integer literals.
+    def __init__(self, number_of_variables):
+        # The variables 1 to number_of_variables are the x_i variables of the input formula, every c_i_j variable
+        # gets the next free number when it is used for the first time.
+        self.clauses = []
+        self.number_of_input_variables = number_of_variables
+        self.names = [None]
+        for i in range(1, number_of_variables + 1):
+            self.names.append("x_" + str(i))
+        self.c_numbers = {}
+
+    def number_of_variables(self):
+        return len(self.names) - 1
+
+    def c_variable(self, clause_number, node_number):  # Method that returns the number of the variable c_i_j.
+        key = (clause_number, node_number)
+        number = self.c_numbers.get(key)
+        if number is None:
+            number = len(self.names)
+            self.names.append("c_" + str(clause_number) + "_" + str(node_number))
+            self.c_numbers[key] = number
+        return number
+
+
+class Statistics:  # The class Statistics shows how the choice of the root affects the transformation.
+    def __init__(self, root_strategy, depth, clones, auxiliary_variables, clauses, width):
+        self.root_strategy = root_strategy
+        self.depth = depth  # Depth of the normalized tree decomposition.
+        self.clones = clones  # Number of nodes added by the normalization.
+        self.auxiliary_variables = auxiliary_variables  # Number of c-variables of the new formula.
+        self.clauses = clauses  # Number of clauses of the new formula.
+        self.width = width
+
+    def __str__(self):
+        return ("root strategy " + self.root_strategy + ": depth " + str(self.depth) + ", " + str(self.clones)
+                + " clones, " + str(self.auxiliary_variables) + " auxiliary variables, " + str(self.clauses)
+                + " clauses, width " + str(self.width))
+
+    def to_dict(self):
+        return {"root_strategy": self.root_strategy, "depth": self.depth, "clones": self.clones,
+                "auxiliary_variables": self.auxiliary_variables, "clauses": self.clauses, "width": self.width}
+
+
+class Encoder:  # The class Encoder is the pass of the tree decomposition sweep that writes the new formula.
+    def __init__(self, clauses, formula):
+        self.clauses = clauses
+        self.formula = formula
+
+    def visit(self, node):
+        # Method that writes the definitional clauses of each c_i_j variable of a node directly into the clause list
+        # of the formula. The children of the node have been visited before and the pass Tables has filled the
+        # introduce and forget tables of the node.
+        formula = self.formula
+        for clause_number in node.bag_c:
+            # The "clause" of a c-variable is the disjunction of the c-variables of the children and the literals
+            # introduced in this node.
+            literals = []
+            c_save = None
+            for child in node.children:
+                child_variable = child.bag_c.get(clause_number)
+                if child_variable is not None:
+                    literals.append(formula.c_variable(clause_number, child_variable))
+                    c_save = child_variable
+            introduced = node.introduced[clause_number]
+
+            # A clause is closed by closing the last clause variable positively.
+            closed = clause_number in node.forgotten
+
+            if len(literals) == 1 and len(introduced) == 0:
+                node.bag_c[clause_number] = c_save
+            else:
+                # c <-> (l_1 | ... | l_k) is written as (~c | l_1 | ... | l_k) and (c | ~l_i) for each i. If c is
+                # closed, the clauses (c | ~l_i) are subsumed by the unit clause c and are left out.
+                literals.extend(introduced)
+                c = formula.c_variable(clause_number, node.bag_c[clause_number])
+                formula.clauses.append([-c] + literals)
+                if not closed:
+                    for literal in literals:
+                        formula.clauses.append([c, -literal])
+
+            if closed:
+                formula.clauses.append([formula.c_variable(clause_number, node.bag_c[clause_number])])
+
+
+class Counter:  # The class Counter is the pass of the sweep that counts the output of the Encoder without writing it.
+    def __init__(self):
+        self.auxiliary_variables = 0
+        self.clauses = 0
+        self.literals = 0
+
+    def visit(self, node):
+        # The same decisions as in Encoder.visit: a c-variable with exactly one child variable and no introduced
+        # literal is replaced by the child variable, every other one is a new variable with its definitional clauses.
+        for clause_number in node.bag_c:
+            children = 0
+            for child in node.children:
+                if clause_number in child.bag_c:
+                    children += 1
+            introduced = len(node.introduced[clause_number])
+            closed = clause_number in node.forgotten
+            if children != 1 or introduced != 0:
+                self.auxiliary_variables += 1
+                self.clauses += 1
+                self.literals += 1 + children + introduced
+                if not closed:
+                    self.clauses += children + introduced
+                    self.literals += 2 * (children + introduced)
+            if closed:
+                self.clauses += 1
+                self.literals += 1
+
+
+def transform(root, clauses, passes=(), number_of_variables=None):
+    # Method that computes the new formula for a rooted tree decomposition. The tables of the nodes and further
+    # passes (for example a decomposition.Width) are computed in the same sweep over the tree decomposition. The
+    # c-variables are numbered after number_of_variables (None means the largest variable of the clauses).
+    if number_of_variables is None:
+        number_of_variables = clauses.number_of_variables()
+    formula = Formula(number_of_variables)
+    decomposition.sweep(root, [decomposition.Tables(clauses), Encoder(clauses, formula)] + list(passes))
+    return formula
+
+
+def count(root, clauses, passes=()):
+    # Method that computes the number of auxiliary variables, clauses and literals of the new formula for a rooted
+    # tree decomposition without building it. It returns the Counter, further passes are run in the same sweep.
+    counter = Counter()
+    decomposition.sweep(root, [decomposition.Tables(clauses), counter] + list(passes))
+    return counter
@@ -0,0 +1,94 @@
+import numpy as np  # This package provides the bit arrays of the truth tables.
+
+from . import qdimacs  # This package provides the literals of the clauses.
+
+# The evaluator computes the truth table of the matrix over all assignments of the variables that occur in the
+# clauses, 64 assignments per 64-bit word, and removes the variables from the innermost to the outermost by combining
+# the two halves of the table with "or" (existential) or "and" (universal). A table has 2 ** n bits for n variables,
+# so at most MAX_VARIABLES variables are allowed (2 MB per table).
+MAX_VARIABLES = 24
+
+# Truth tables of the variables at the positions 0 to 5 of a word, the variables at the positions 6 and above are
+# constant within a word.
+WORD_PATTERNS = np.array([0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0, 0xFF00FF00FF00FF00,
+                          0xFFFF0000FFFF0000, 0xFFFFFFFF00000000], dtype=np.uint64)
+WORD_BITS = len(WORD_PATTERNS)
+ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def get_order(blocks, levels, variables):
+    # Method that returns the variables sorted from the innermost to the outermost block and their quantifiers. Free
+    # variables are existential and quantified outside of all blocks.
+    levels = np.asarray(levels)
+    variables = variables[np.argsort(-levels[variables], kind="stable")]
+    quantifiers = []
+    for variable in variables:
+        quantifiers.append("e" if levels[variable] == 0 else blocks[levels[variable] - 1])
+    return variables, quantifiers
+
+
+def get_tables(number_of_variables):
+    # Method that returns the truth tables of the positions 0 to number_of_variables - 1. The table of a position is
+    # set at the assignments (bit indices) that have this bit set.
+    words = 1 << max(number_of_variables - WORD_BITS, 0)
+    tables = []
+    for position in range(number_of_variables):
+        if position < WORD_BITS:
+            tables.append(np.full(words, WORD_PATTERNS[position], dtype=np.uint64))
+        else:
+            bits = (np.arange(words, dtype=np.uint64) >> np.uint64(position - WORD_BITS)) & np.uint64(1)
+            tables.append(bits * ALL_ONES)
+    return tables
+
+
+def get_matrix(literals, lengths, numbers, tables, words):
+    # Method that returns the truth table of the clauses, numbers maps the variables to their positions.
+    matrix = np.full(words, ALL_ONES, dtype=np.uint64)
+    start = 0
+    for length in lengths.tolist():
+        clause = np.zeros(words, dtype=np.uint64)
+        for literal in literals[start:start + length].tolist():
+            table = tables[numbers[abs(literal)]]
+            clause |= table if literal > 0 else ~table
+        matrix &= clause
+        start += length
+    return matrix
+
+
+def quantify(table, position, quantifier):
+    # Method that removes the variable at a position from a table. The positions below have been removed before, so a
+    # variable at position 6 or above is always the lowest bit of the word index.
+    if position < WORD_BITS:
+        shift = np.uint64(1 << position)
+        mask = ~WORD_PATTERNS[position]
+        low = table & mask
+        high = (table >> shift) & mask
+        combined = low | high if quantifier == "e" else low & high
+        return combined | (combined << shift)
+    halves = table.reshape(-1, 2)
+    if quantifier == "e":
+        return halves[:, 0] | halves[:, 1]
+    return halves[:, 0] & halves[:, 1]
+
+
+def evaluate(blocks, levels, clauses):
+    # Method that returns the truth value of a closed prenex formula with the blocks and levels as returned by
+    # qdimacs.read_qdimacs. clauses is a ClauseStore or a list of integer clauses. Variables that do not occur in the
+    # clauses do not change the value and are ignored.
+    literals, lengths = qdimacs.get_literals(clauses)
+    if np.any(lengths == 0):
+        return False
+    if len(literals) == 0:
+        return True
+    variables = np.unique(np.abs(literals))
+    if len(variables) > MAX_VARIABLES:
+        raise ValueError("too many variables for the evaluator: " + str(len(variables)))
+    variables, quantifiers = get_order(blocks, levels, variables)
+    numbers = {}
+    for position in range(len(variables)):
+        numbers[int(variables[position])] = position
+    tables = get_tables(len(variables))
+    table = get_matrix(literals, lengths, numbers, tables, len(tables[0]))
+    for position in range(len(variables)):
+        table = quantify(table, position, quantifiers[position])
+    return bool(table[0] & np.uint64(1))
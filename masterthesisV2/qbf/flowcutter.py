@@ -0,0 +1,90 @@
+import queue  # This package provides a thread safe queue.
+import subprocess  # This package provides access to external programs.
+import threading  # This package provides threads.
+import time  # This package provides access to the system time.
+
+from . import pace  # This package provides the .gr and .td file formats.
+
+
+class StopRule:  # The class StopRule decides when an anytime tree decomposition solver is stopped.
+    def __init__(self, time_limit=30, plateau_time=None, target_width=None, time_per_node=None, minimum_time=1):
+        self.time_limit = time_limit  # The solver is never run longer than time_limit seconds.
+        self.plateau_time = plateau_time  # Stop if the width did not improve for plateau_time seconds.
+        self.target_width = target_width  # Stop as soon as a decomposition with this bag size is known.
+        # If time_per_node is set, the budget is minimum_time plus time_per_node seconds per graph node.
+        self.time_per_node = time_per_node
+        self.minimum_time = minimum_time
+
+    def budget(self, number_of_nodes):
+        if self.time_per_node is None:
+            return self.time_limit
+        return min(self.time_limit, self.minimum_time + self.time_per_node * number_of_nodes)
+
+    def stop(self, elapsed, since_improvement, width, number_of_nodes):
+        if elapsed >= self.budget(number_of_nodes):
+            return True
+        if width is None:
+            return False
+        if self.target_width is not None and width <= self.target_width:
+            return True
+        return self.plateau_time is not None and since_improvement >= self.plateau_time
+
+
+def read_lines(stream, lines):  # Method that moves every line of a stream into a queue, followed by None.
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def get_tree_decomposition(command, path_graph, stop_rule, number_of_nodes=0, grace_time=10, candidates=None):
+    # Method that runs a PACE tree decomposition solver (command is a list, the path of the .gr file is appended) and
+    # reads its output through a pipe. Every complete decomposition is parsed as soon as it arrives, as are
+    # "c status <width> ..." lines. When stop_rule says so, the solver gets SIGTERM, so that it prints its best
+    # decomposition, and is killed after grace_time seconds. The decomposition with the smallest width is returned
+    # as (bags, edges, width), where bags contain the node ids of the .gr file. If candidates is a list, every
+    # complete decomposition is appended to it in the order of the output.
+    process = subprocess.Popen(list(command) + [path_graph], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    lines = queue.Queue()
+    threading.Thread(target=read_lines, args=(process.stdout, lines), daemon=True).start()
+    reader = pace.TreeDecompositionReader()
+    best = None
+    width = None  # Smallest width known so far, also from status lines.
+    start = time.monotonic()
+    improvement = start
+    deadline = None  # Set when the solver got SIGTERM.
+
+    while True:
+        now = time.monotonic()
+        if deadline is None and stop_rule.stop(now - start, now - improvement, width, number_of_nodes):
+            process.terminate()
+            deadline = now + grace_time
+        if deadline is not None and now >= deadline:
+            process.kill()
+            break
+        try:
+            line = lines.get(timeout=0.05)
+        except queue.Empty:
+            continue
+        if line is None:  # The solver terminated.
+            break
+        split = line.split()
+        if len(split) > 2 and split[0] == b"c" and split[1] == b"status":
+            status_width = int(split[2])
+            if width is None or status_width < width:
+                width = status_width
+                improvement = time.monotonic()
+            continue
+        decomposition = reader.feed(line)
+        if decomposition:
+            if candidates is not None:
+                candidates.append(decomposition)
+            if best is None or decomposition[2] <= best[2]:
+                best = decomposition
+            if width is None or decomposition[2] < width:
+                width = decomposition[2]
+                improvement = time.monotonic()
+    process.wait()
+
+    if best is None:
+        raise RuntimeError("no tree decomposition received from " + str(command[0]))
+    return best
@@ -0,0 +1,123 @@
+import argparse  # This package provides the command line interface of the generator.
+import random  # This package provides the seeded random numbers of the instances.
+import sys  # This package provides access to the command line arguments.
+
+import numpy as np  # This package provides compact arrays.
+
+from . import qdimacs  # This package provides the clause store and the qdimacs writer.
+
+# Families of instances. RANDOM draws the variables of every clause from all variables, so the treewidth grows with
+# the size. PATH, GRID and TREE draw them from small windows of a path, a grid with width columns or a random
+# partial width-tree, so the treewidth of the primal graph is at most width (GRID: about width).
+RANDOM = "random"
+PATH = "path"
+GRID = "grid"
+TREE = "tree"
+FAMILIES = [RANDOM, PATH, GRID, TREE]
+
+
+def random_clause(variables, k, rng):  # Method that returns a clause over k of the given variables with random signs.
+    return [variable if rng.random() < 0.5 else -variable for variable in rng.sample(variables, min(k, len(variables)))]
+
+
+def random_clauses(number_of_variables, number_of_clauses, k, rng):
+    variables = range(1, number_of_variables + 1)
+    return [random_clause(variables, k, rng) for _ in range(number_of_clauses)]
+
+
+def path_clauses(number_of_variables, number_of_clauses, k, width, rng):
+    # Every clause is taken from a window of width + 1 consecutive variables.
+    window = min(width + 1, number_of_variables)
+    clauses = []
+    for _ in range(number_of_clauses):
+        start = rng.randint(1, number_of_variables - window + 1)
+        clauses.append(random_clause(range(start, start + window), k, rng))
+    return clauses
+
+
+def grid_clauses(number_of_variables, number_of_clauses, k, width, rng):
+    # The variables fill a grid with width columns row by row. Every clause is taken from a square of side cells
+    # (side is large enough to hold k variables), so the grid and its treewidth of about width stay intact.
+    side = 2
+    while side * side < k:
+        side += 1
+    rows = (number_of_variables + width - 1) // width
+    clauses = []
+    for _ in range(number_of_clauses):
+        row = rng.randint(0, max(rows - side, 0))
+        column = rng.randint(0, max(width - side, 0))
+        variables = []
+        for i in range(row, min(row + side, rows)):
+            for j in range(column, min(column + side, width)):
+                variable = i * width + j + 1
+                if variable <= number_of_variables:
+                    variables.append(variable)
+        clauses.append(random_clause(variables, k, rng))
+    return clauses
+
+
+def tree_clauses(number_of_variables, number_of_clauses, k, width, rng):
+    # The bags of a random partial width-tree: the first bag holds the variables 1 to width + 1, every further
+    # variable gets a new bag that is one of the last width + 1 bags with its oldest variable replaced by the new
+    # variable. Every clause is taken from a random bag. Copying any old bag or replacing a random variable would let
+    # some variables stay in thousands of bags, which is a different (hub) structure.
+    bags = [list(range(1, min(width + 1, number_of_variables) + 1))]
+    for variable in range(len(bags[0]) + 1, number_of_variables + 1):
+        bag = list(rng.choice(bags[-width - 1:]))
+        bag[bag.index(min(bag))] = variable
+        bags.append(bag)
+    return [random_clause(rng.choice(bags), k, rng) for _ in range(number_of_clauses)]
+
+
+def get_prefix(number_of_variables, prefix, rng):
+    # Method that splits the variables randomly into len(prefix) blocks of equal size with the quantifiers of the
+    # string prefix (for example "ae" for a forall-exists formula). It returns the blocks and the levels as read by
+    # qdimacs.read_qdimacs.
+    variables = list(range(1, number_of_variables + 1))
+    rng.shuffle(variables)
+    levels = np.zeros(number_of_variables + 1, dtype=np.int32)
+    for i in range(len(prefix)):
+        levels[variables[i * number_of_variables // len(prefix):(i + 1) * number_of_variables // len(prefix)]] = i + 1
+    return list(prefix), levels
+
+
+def generate(family, number_of_variables, number_of_clauses, k=3, width=4, prefix="ae", seed=0):
+    # Method that generates an instance of a family with clauses of k variables. The same arguments always give the
+    # same instance. It returns blocks, levels and clauses like qdimacs.read_qdimacs.
+    if family not in FAMILIES:
+        raise ValueError("unknown family " + str(family))
+    if any(quantifier not in "ae" for quantifier in prefix) or not 0 < len(prefix) <= number_of_variables:
+        raise ValueError("invalid prefix " + str(prefix))
+    rng = random.Random(str((family, number_of_variables, number_of_clauses, k, width, prefix, seed)))
+    if family == RANDOM:
+        clauses = random_clauses(number_of_variables, number_of_clauses, k, rng)
+    elif family == PATH:
+        clauses = path_clauses(number_of_variables, number_of_clauses, k, width, rng)
+    elif family == GRID:
+        clauses = grid_clauses(number_of_variables, number_of_clauses, k, width, rng)
+    else:
+        clauses = tree_clauses(number_of_variables, number_of_clauses, k, width, rng)
+    blocks, levels = get_prefix(number_of_variables, prefix, rng)
+    return blocks, levels, qdimacs.from_clauses(clauses)
+
+
+def main(arguments):
+    # The generator command, for example "python3 -m qbf.generator grid 10000 30000 --width 8 -o input/grid.qdimacs"
+    # in the directory masterthesisV2.
+    parser = argparse.ArgumentParser(description="Generate a synthetic qdimacs instance.")
+    parser.add_argument("family", choices=FAMILIES)
+    parser.add_argument("variables", type=int)
+    parser.add_argument("clauses", type=int)
+    parser.add_argument("-k", type=int, default=3, help="number of variables of a clause")
+    parser.add_argument("--width", type=int, default=4, help="treewidth bound of the path, grid and tree families")
+    parser.add_argument("--prefix", default="ae", help="quantifiers of the blocks, for example e, ae or eae")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", required=True)
+    options = parser.parse_args(arguments)
+    blocks, levels, clauses = generate(options.family, options.variables, options.clauses, options.k,
+                                       options.width, options.prefix, options.seed)
+    qdimacs.write_qdimacs_file(options.output, blocks, levels, clauses)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,102 @@
+import numpy as np  # This package provides compact arrays.
+
+
+class Graph:  # The class Graph is an undirected graph in compressed sparse row (CSR) format.
+    def __init__(self, indptr, indices, labels):
+        # The neighbours of node i are indices[indptr[i]:indptr[i + 1]]. labels[i] is v for the variable node x_v
+        # and -i for the clause node c_i.
+        self.indptr = indptr
+        self.indices = indices
+        self.labels = labels
+
+    def number_of_nodes(self):
+        return len(self.labels)
+
+    def number_of_edges(self):
+        return len(self.indices) // 2
+
+    def neighbours(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def name(self, node):  # Returns the name "x_v" or "c_i" of a node.
+        return label_name(self.labels[node])
+
+    def edges(self):  # Returns the arrays u and v of all edges (u[k], v[k]) with u[k] < v[k].
+        sources = np.repeat(np.arange(self.number_of_nodes(), dtype=self.indices.dtype), np.diff(self.indptr))
+        mask = sources < self.indices
+        return sources[mask], self.indices[mask]
+
+    def to_networkx(self):  # Method that exports the graph with "x_v" and "c_i" node names to networkx.
+        import networkx as nx  # networkx is only imported if a caller needs a networkx graph.
+        graph = nx.Graph()
+        names = [self.name(node) for node in range(self.number_of_nodes())]
+        graph.add_nodes_from(names)
+        sources, targets = self.edges()
+        graph.add_edges_from(zip([names[u] for u in sources.tolist()], [names[v] for v in targets.tolist()]))
+        return graph
+
+
+def label_name(label):  # Method that returns the name "x_v" or "c_i" of a node label.
+    label = int(label)
+    if label > 0:
+        return "x_" + str(label)
+    return "c_" + str(-label)
+
+
+def from_edges(number_of_nodes, sources, targets, labels):
+    # Method that builds a Graph from edge arrays. Loops and duplicate edges are removed. Every edge is encoded as
+    # one integer source * number_of_nodes + target in both directions, so a single sort groups the edges by source
+    # and orders the neighbours of each node.
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    mask = sources != targets
+    sources = sources[mask]
+    targets = targets[mask]
+    keys = np.concatenate((sources * number_of_nodes + targets, targets * number_of_nodes + sources))
+    keys.sort()
+    if len(keys) > 0:
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    counts = np.bincount(keys // number_of_nodes, minlength=number_of_nodes)
+    indptr = np.zeros(number_of_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return Graph(indptr, (keys % number_of_nodes).astype(np.int32), labels)
+
+
+def variable_nodes(clauses):
+    # Method that numbers the variables occurring in the clauses 0, 1, ... and returns the variable of each literal
+    # as node number together with the variable numbers (labels) of the nodes.
+    variables = np.abs(clauses.literals).astype(np.int64)
+    present = np.zeros(clauses.number_of_variables() + 1, dtype=bool)
+    present[variables] = True
+    labels = np.flatnonzero(present)
+    node_numbers = np.cumsum(present) - 1
+    return node_numbers[variables], labels
+
+
+def get_incidence_graph(clauses):
+    # Build the incidence (bipartite) graph of a given formula: the occurring variables are the first nodes, they
+    # are followed by one node for each clause.
+    literal_nodes, labels = variable_nodes(clauses)
+    number_of_variables = len(labels)
+    lengths = np.diff(clauses.offsets)
+    clause_nodes = number_of_variables + np.repeat(np.arange(len(clauses), dtype=np.int64), lengths)
+    labels = np.concatenate((labels, -np.arange(1, len(clauses) + 1))).astype(np.int64)
+    return from_edges(len(labels), literal_nodes, clause_nodes, labels)
+
+
+def get_primal_graph(clauses):
+    # Build the primal graph of a given formula: two variables are adjacent if they occur in a common clause. The
+    # pairs are generated for all clauses of the same length at once.
+    literal_nodes, labels = variable_nodes(clauses)
+    lengths = np.diff(clauses.offsets)
+    sources = [np.zeros(0, dtype=np.int64)]
+    targets = [np.zeros(0, dtype=np.int64)]
+    for length in np.unique(lengths).tolist():
+        if length < 2:
+            continue
+        starts = clauses.offsets[:-1][lengths == length]
+        matrix = literal_nodes[starts[:, None] + np.arange(length)]
+        first, second = np.triu_indices(length, 1)
+        sources.append(matrix[:, first].ravel())
+        targets.append(matrix[:, second].ravel())
+    return from_edges(len(labels), np.concatenate(sources), np.concatenate(targets), labels.astype(np.int64))
@@ -0,0 +1,180 @@
+import collections  # This package provides the queue of the breadth-first search.
+import itertools  # This package provides the concatenation of the clause groups.
+
+from . import decomposition  # This package provides the tree decomposition data structure.
+from . import encoding  # This package provides the encoder of the new formula.
+
+# The clauses of the new formula fall into one group per clause i of the input formula: the definitional clauses of
+# the c_i_j variables and the unit clause of the top node. A group only depends on the clause, the nodes whose bags
+# contain c_i and the x-variables of these bags. So removing a clause removes its group, and adding a clause puts c_i
+# into a connected subtree of nodes that covers its variables and encodes only this subtree. The tree itself is not
+# changed (the bags of the other clauses and the normalization stay as they are), but the width can grow.
+
+
+class Transformation:  # The class Transformation keeps a new formula up to date when clauses are added or removed.
+    def __init__(self, bags, edges, clauses, root_strategy=decomposition.ROOT_COST, number_of_variables=None):
+        # The first new formula is computed by encoding.transform like in pipeline.special_solving, bags are lists of
+        # node labels (v for x_v and -i for c_i) and clauses is a ClauseStore. Added clauses may use the variables 1 to
+        # number_of_variables (None means the largest variable of the clauses), for example len(levels) - 1.
+        self.root, self.nodes = decomposition.get_nodes(bags, edges, root_strategy)
+        decomposition.normalize(self.root, self.nodes)
+        self.formula = encoding.transform(self.root, clauses, number_of_variables=number_of_variables)
+        self.clauses = [list(clause) for clause in clauses]  # Removed clauses are None, the numbers stay the same.
+        self.variable_nodes = None  # Nodes whose bags contain x_v, by v. Built by the first added clause.
+
+        # Split the new formula into the groups of the clauses. The first literal of every clause that the encoder
+        # writes is a c-variable of its clause.
+        owners = {}
+        for (clause_number, _), number in self.formula.c_numbers.items():
+            owners[number] = clause_number
+        self.groups = {}
+        for clause_number in range(1, len(self.clauses) + 1):
+            self.groups[clause_number] = []
+        for clause in self.formula.clauses:
+            self.groups[owners[abs(clause[0])]].append(clause)
+
+        # The top node of every clause is the node whose parent does not contain the clause.
+        self.tops = {}
+        for node in self.nodes:
+            for clause_number in node.bag_c:
+                if node.parent is None or clause_number not in node.parent.bag_c:
+                    self.tops[clause_number] = node
+
+    def get_subtree(self, clause_number):
+        # Method that returns the nodes that contain a clause in post order, i.e. in the order of the encoder.
+        order = []
+        stack = [self.tops[clause_number]]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            for child in node.children:
+                if clause_number in child.bag_c:
+                    stack.append(child)
+        order.reverse()
+        return order
+
+    def encode(self, clause_number):
+        # Method that returns the group of a clause, with the same decisions as encoding.Encoder.visit.
+        formula = self.formula
+        clause = self.clauses[clause_number - 1]
+        top = self.tops[clause_number]
+        order = self.get_subtree(clause_number)
+        for node in order:
+            node.bag_c[clause_number] = node.number
+        group = []
+        for node in order:
+            children = [child for child in node.children if clause_number in child.bag_c]
+            literals = [formula.c_variable(clause_number, child.bag_c[clause_number]) for child in children]
+            introduced = []
+            for literal in clause:
+                variable = abs(literal)
+                if variable in node.bag_x and not any(variable in child.bag_x for child in children):
+                    introduced.append(literal)
+            if len(literals) == 1 and len(introduced) == 0:
+                node.bag_c[clause_number] = children[0].bag_c[clause_number]
+            else:
+                literals.extend(introduced)
+                c = formula.c_variable(clause_number, node.bag_c[clause_number])
+                group.append([-c] + literals)
+                if node is not top:
+                    for literal in literals:
+                        group.append([c, -literal])
+            if node is top:
+                group.append([formula.c_variable(clause_number, node.bag_c[clause_number])])
+        return group
+
+    def get_variable_nodes(self):  # Method that returns the nodes of every x-variable.
+        if self.variable_nodes is None:
+            self.variable_nodes = {}
+            for node in self.nodes:
+                for variable in node.bag_x:
+                    self.variable_nodes.setdefault(variable, []).append(node)
+        return self.variable_nodes
+
+    def connect(self, subtree, variable):
+        # Method that adds the nodes of the shortest path from the connected set of nodes subtree to a node that
+        # contains x_variable to subtree (breadth-first search over the tree).
+        previous = {}
+        for node in subtree:
+            previous[node] = None
+        queue = collections.deque(subtree)
+        while queue:
+            node = queue.popleft()
+            if variable in node.bag_x:
+                while node not in subtree:
+                    subtree.add(node)
+                    node = previous[node]
+                return
+            neighbours = list(node.children)
+            if node.parent is not None:
+                neighbours.append(node.parent)
+            for neighbour in neighbours:
+                if neighbour not in previous:
+                    previous[neighbour] = node
+                    queue.append(neighbour)
+
+    def place(self, clause_number):
+        # Method that puts a new clause into the bags of a connected subtree that covers its variables. The subtree
+        # starts at the node that contains most of the variables, variables that are in no bag yet are added to this
+        # node.
+        variable_nodes = self.get_variable_nodes()
+        variables = set(abs(literal) for literal in self.clauses[clause_number - 1])
+        known = [variable for variable in variables if variable in variable_nodes]
+        if known:
+            counts = collections.Counter()
+            for variable in known:
+                counts.update(variable_nodes[variable])
+            anchor = max(counts, key=lambda node: (counts[node], -len(node.bag_x) - len(node.bag_c)))
+        else:
+            anchor = min(self.nodes, key=lambda node: len(node.bag_x) + len(node.bag_c))
+        subtree = {anchor}
+        for variable in known:
+            if variable not in anchor.bag_x:
+                self.connect(subtree, variable)
+        new_variables = variables.difference(known)
+        if new_variables:
+            anchor.bag_x = anchor.bag_x.union(new_variables)  # The frozenset may be shared with clones.
+            for variable in new_variables:
+                variable_nodes[variable] = [anchor]
+        for node in subtree:
+            node.bag_c[clause_number] = node.number
+            if node.parent is None or node.parent not in subtree:
+                self.tops[clause_number] = node
+
+    def update(self, added=(), removed=()):
+        # Method that removes the clauses with the numbers in removed and adds the clauses in added (lists of
+        # literals). Only the groups of these clauses are computed. It returns the numbers of the added clauses.
+        # Added clauses may only use the variables 1 to number_of_variables of the constructor, a larger variable
+        # would get the number of a c-variable (the whole transformation has to be run again then).
+        for clause in added:
+            for literal in clause:
+                if not 0 < abs(literal) <= self.formula.number_of_input_variables:
+                    raise ValueError("variable " + str(abs(literal)) + " is not a variable of the input formula")
+        for clause_number in removed:
+            if self.clauses[clause_number - 1] is None:
+                raise ValueError("clause " + str(clause_number) + " is already removed")
+            for node in self.get_subtree(clause_number):
+                del node.bag_c[clause_number]
+            self.clauses[clause_number - 1] = None
+            del self.groups[clause_number]
+            del self.tops[clause_number]
+        numbers = []
+        for clause in added:
+            self.clauses.append(list(clause))
+            clause_number = len(self.clauses)
+            self.place(clause_number)
+            self.groups[clause_number] = self.encode(clause_number)
+            numbers.append(clause_number)
+        return numbers
+
+    def get_formula(self):
+        # Method that returns the new formula. Its clauses are the groups of the clauses that were not removed, the
+        # c-variables of removed clauses keep their numbers but do not occur any more.
+        self.formula.clauses = list(itertools.chain.from_iterable(self.groups.values()))
+        return self.formula
+
+    def get_clauses(self):  # Method that returns the current clauses of the input formula.
+        return [clause for clause in self.clauses if clause is not None]
+
+    def width(self):  # Method that returns the width of the tree decomposition with the current clauses.
+        return self.root.width()
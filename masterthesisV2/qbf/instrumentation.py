@@ -0,0 +1,71 @@
+import contextlib  # This package provides the context manager of a stage.
+import os  # This package provides access to the operating system.
+import resource  # This package provides the resource usage of the process and its tools.
+import time  # This package provides the wall clock and the cpu time.
+import tracemalloc  # This package provides the peak memory of the Python objects.
+
+
+class Stages:  # The class Stages records time and memory of the stages of one instance.
+    def __init__(self, name, trace_memory=False, profile_stage=None, profile_directory="."):
+        # name is the name of the instance. If trace_memory is True, tracemalloc records the peak of the Python
+        # memory of each stage (this slows down the stages). The cProfile output of the stage profile_stage is saved
+        # in profile_directory as <name>_<stage>.prof, it can be read with the pstats package or snakeviz.
+        self.name = name
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.profile_directory = profile_directory
+        self.records = {}
+        self.profiler = None
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        # Context manager that measures the code in its block as stage name. A stage that is entered several times
+        # is summed up (also in the profile). cpu is the time of this process and cpu_tools the time of the tools
+        # that ended in the stage. peak_rss is the largest resident set size of this process (peak_rss_tools of a
+        # tool) until the end of the stage in bytes.
+        profiler = None
+        if name == self.profile_stage:
+            if self.profiler is None:
+                import cProfile  # cProfile is only imported if a stage is profiled.
+                self.profiler = cProfile.Profile()
+            profiler = self.profiler
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        usage_self = resource.getrusage(resource.RUSAGE_SELF)
+        usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - start
+            end_self = resource.getrusage(resource.RUSAGE_SELF)
+            end_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            record = self.records.setdefault(name, {"calls": 0, "wall": 0.0, "cpu": 0.0, "cpu_tools": 0.0,
+                                                    "peak_rss": 0, "peak_rss_tools": 0})
+            record["calls"] += 1
+            record["wall"] += wall
+            record["cpu"] += end_self.ru_utime + end_self.ru_stime - usage_self.ru_utime - usage_self.ru_stime
+            record["cpu_tools"] += (end_children.ru_utime + end_children.ru_stime - usage_children.ru_utime
+                                    - usage_children.ru_stime)
+            record["peak_rss"] = max(record["peak_rss"], end_self.ru_maxrss * 1024)  # ru_maxrss is in KiB on Linux.
+            record["peak_rss_tools"] = max(record["peak_rss_tools"], end_children.ru_maxrss * 1024)
+            if self.trace_memory:
+                record["peak_traced"] = max(record.get("peak_traced", 0), tracemalloc.get_traced_memory()[1])
+            if profiler is not None:
+                os.makedirs(self.profile_directory, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_directory, self.name + "_" + name + ".prof"))
+
+    def to_dict(self):  # Returns the records of the stages in the order in which they were entered first.
+        return self.records
+
+    def __str__(self):
+        parts = []
+        for name, record in self.records.items():
+            parts.append(name + " " + str(round(record["wall"], 3)) + " s")
+        return ", ".join(parts)
@@ -0,0 +1,118 @@
+import numpy as np  # This package provides compact arrays.
+
+from . import graphs  # This package provides the primal and incidence graphs.
+
+EDGE_CHUNK_SIZE = 1 << 16  # Number of edges that are formatted and written at once.
+LITERAL_CHUNK_SIZE = 1 << 20  # Number of literals of the clause store that are processed at once.
+BUFFER_SIZE = 1 << 20  # Size of the write buffer of the .gr file.
+
+
+def write_edges(file, sources, targets):  # Method that writes edges (with 0-based node ids) in large chunks.
+    for start in range(0, len(sources), EDGE_CHUNK_SIZE):
+        pairs = np.empty((min(EDGE_CHUNK_SIZE, len(sources) - start), 2), dtype=np.int64)
+        pairs[:, 0] = sources[start:start + EDGE_CHUNK_SIZE]
+        pairs[:, 1] = targets[start:start + EDGE_CHUNK_SIZE]
+        pairs += 1
+        file.write((b"%d %d\n" * len(pairs)) % tuple(pairs.ravel().tolist()))
+
+
+def incidence_edges(clauses, literal_nodes, number_of_variables):
+    # Generator that returns the edges of the incidence graph for chunks of clauses without building the graph.
+    # Duplicate edges can only come from the same clause, so they are removed within each chunk.
+    number_of_nodes = number_of_variables + len(clauses)
+    first = 0
+    while first < len(clauses):
+        last = int(np.searchsorted(clauses.offsets, clauses.offsets[first] + LITERAL_CHUNK_SIZE, side="right")) - 1
+        last = min(max(last, first + 1), len(clauses))
+        start = clauses.offsets[first]
+        end = clauses.offsets[last]
+        lengths = np.diff(clauses.offsets[first:last + 1])
+        clause_nodes = number_of_variables + np.repeat(np.arange(first, last, dtype=np.int64), lengths)
+        keys = clause_nodes * number_of_nodes + literal_nodes[start:end]
+        keys.sort()
+        if len(keys) > 0:
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        yield keys % number_of_nodes, keys // number_of_nodes
+        first = last
+
+
+def incidence_labels(clauses, labels=None):
+    # Method that returns the label array of the incidence graph of a given formula (see write_incidence_graph).
+    if labels is None:
+        _, labels = graphs.variable_nodes(clauses)
+    return np.concatenate((labels, -np.arange(1, len(clauses) + 1))).astype(np.int64)
+
+
+def write_incidence_graph(path, clauses):
+    # Method that saves the incidence graph of a given formula in a .gr file straight from the clause store. Node i of
+    # graphs.get_incidence_graph(clauses) gets the id i + 1, so the returned label array maps the id k of the file to
+    # the label labels[k - 1] (see graphs.Graph).
+    literal_nodes, labels = graphs.variable_nodes(clauses)
+    number_of_variables = len(labels)
+    labels = incidence_labels(clauses, labels)
+    number_of_edges = 0
+    for sources, _ in incidence_edges(clauses, literal_nodes, number_of_variables):
+        number_of_edges += len(sources)
+    with open(path, "wb", buffering=BUFFER_SIZE) as file:
+        file.write(b"p tw %d %d\n" % (len(labels), number_of_edges))
+        for sources, targets in incidence_edges(clauses, literal_nodes, number_of_variables):
+            write_edges(file, sources, targets)
+    return labels
+
+
+class TreeDecompositionReader:  # The class TreeDecompositionReader parses .td output line by line.
+    def __init__(self):
+        self.bags = None
+        self.edges = None
+        self.number_of_bags = 0
+        self.width = 0
+
+    def feed(self, line):
+        # Method that processes one line. It returns (bags, edges, width) as soon as a decomposition is complete,
+        # otherwise None. Bags are lists of node ids, edges are pairs of 0-based bag indices and the width is the
+        # largest bag size as given in the "s td" line.
+        split = line.split()
+        if not split or split[0] in (b"c", "c"):
+            return None
+        if split[0] in (b"s", "s"):
+            self.number_of_bags = int(split[2])
+            self.width = int(split[3])
+            self.bags = [None] * self.number_of_bags
+            self.edges = []
+        elif self.bags is None:
+            return None
+        elif split[0] in (b"b", "b"):
+            self.bags[int(split[1]) - 1] = list(map(int, split[2:]))
+        else:
+            self.edges.append((int(split[0]) - 1, int(split[1]) - 1))
+        if len(self.edges) == self.number_of_bags - 1 and None not in self.bags:
+            decomposition = (self.bags, self.edges, self.width)
+            self.bags = None
+            self.edges = None
+            return decomposition
+        return None
+
+
+def read_tree_decompositions_file(path):  # Method that reads all complete decompositions of a .td file in their order.
+    reader = TreeDecompositionReader()
+    decompositions = []
+    with open(path, "rb") as file:
+        for line in file:
+            complete = reader.feed(line)
+            if complete:
+                decompositions.append(complete)
+    return decompositions
+
+
+def write_tree_decompositions(path, decompositions, number_of_nodes):
+    # Method that saves several decompositions (pairs of bags and edges) one after another in a .td file.
+    with open(path, "wb", buffering=BUFFER_SIZE) as file:
+        for bags, edges in decompositions:
+            width = 0
+            for bag in bags:
+                width = max(width, len(bag))
+            file.write(b"s td %d %d %d\n" % (len(bags), width, number_of_nodes))
+            for i in range(len(bags)):
+                file.write(b"b %d %s\n" % (i + 1, b" ".join(b"%d" % item for item in bags[i])))
+            for edge in edges:
+                file.write(b"%d %d\n" % (edge[0] + 1, edge[1] + 1))
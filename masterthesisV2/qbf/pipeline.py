@@ -0,0 +1,214 @@
+from . import cache  # This package provides the cache keys.
+from . import decomposition  # This package provides the tree decomposition data structure.
+from . import elimination  # This package provides the elimination ordering heuristics.
+from . import encoding  # This package provides the direct clause encoding of the new formula.
+from . import instrumentation  # This package measures the stages.
+from . import propagation  # This package provides the unit propagation.
+from . import qdimacs  # This package provides the qdimacs reader and writer.
+from . import simplification  # This package provides the bounded variable elimination.
+
+# The steps of the tests as functions, so the tests, the worker (python3 -m qbf.worker) and other programs can use
+# them. flowcutter, the .gr and .td formats and QRATPre+ are only imported when they are used.
+
+
+def preprocess(path_input, directory, artifact_cache, qratpre_path=None, timeout=None, keep=False):
+    # Method to read a qdimacs file at a given path. It returns the formula and the cache key of the formula. The
+    # file is preprocessed with QRATPre+ at qratpre_path (None reads the file as it is), which is stopped after
+    # timeout seconds.
+    if qratpre_path is None:
+        blocks, levels, clauses = qdimacs.read_qdimacs_file(path_input)
+        return blocks, levels, clauses, cache.get_key("formula", cache.file_digest(path_input))
+    from . import tools  # tools is only imported if QRATPre+ is used.
+
+    # Preprocessing the input file to achieve an improvement of the result. The preprocessed formula is read directly
+    # from the output of QRATPre+ and only saved in directory if it is cached or keep is True. It is taken from the
+    # cache if the input file and QRATPre+ did not change.
+    key = cache.get_key("preprocessing", cache.file_digest(path_input), cache.tool_digest(qratpre_path),
+                        tools.QRATPRE_OPTIONS)
+    path_preprocessing = artifact_cache.get(key, "formula.qdimacs")
+    if path_preprocessing is not None:
+        blocks, levels, clauses = qdimacs.read_qdimacs_file(path_preprocessing)
+    else:
+        if artifact_cache.directory is not None or keep:
+            path_preprocessing = directory + "/formula.qdimacs"
+        blocks, levels, clauses = tools.qratpre(qratpre_path, path_input, qdimacs.read_qdimacs, path_preprocessing,
+                                                timeout)
+        if path_preprocessing is not None:
+            artifact_cache.put(key, "formula.qdimacs", path_preprocessing)
+    return blocks, levels, clauses, key
+
+
+def get_label_bags(graph, tree_decomposition):  # Method that translates the bags into the labels of the nodes.
+    bags = []
+    for items in tree_decomposition:
+        bags.append(graph.labels[items].tolist())
+    return bags
+
+
+def heuristic_decomposition(graph, heuristics=None, seeds=1, processes=1):
+    # Method that computes a tree decomposition of a given graph using the elimination ordering heuristics (see
+    # elimination.get_tree_decomposition). The bags contain the labels of the nodes.
+    tree_decomposition, edges, width = elimination.get_tree_decomposition(graph, heuristics, seeds, processes)
+    return get_label_bags(graph, tree_decomposition), edges, width
+
+
+def heuristic_decompositions(graph, heuristics=None, seeds=1, processes=1):
+    # Method that returns the tree decompositions (bags, edges, width) of all runs of the elimination ordering
+    # heuristics (see elimination.get_tree_decompositions). The bags contain the labels of the nodes.
+    results = []
+    for tree_decomposition, edges, width in elimination.get_tree_decompositions(graph, heuristics, seeds, processes):
+        results.append((get_label_bags(graph, tree_decomposition), edges, width))
+    return results
+
+
+def flowcutter_decomposition(directory, clauses, artifact_cache, key, flowcutter_path, time_limit,
+                             plateau_time=None, target_width=None, stages=None, time_per_node=None, minimum_time=1):
+    # Method that computes a tree decomposition of the bipartite graph of a given formula using flowcutter. key is
+    # the cache key of the formula, stages the instrumentation.Stages of the file. The stop rule is described in
+    # flowcutter.StopRule: if time_per_node is set, flowcutter gets minimum_time plus time_per_node seconds per node
+    # of the graph, but never more than time_limit. The bags contain the labels of the nodes.
+    return flowcutter_decompositions(directory, clauses, artifact_cache, key, flowcutter_path, time_limit,
+                                     plateau_time, target_width, stages, time_per_node, minimum_time)[-1]
+
+
+def flowcutter_decompositions(directory, clauses, artifact_cache, key, flowcutter_path, time_limit,
+                              plateau_time=None, target_width=None, stages=None, time_per_node=None, minimum_time=1):
+    # Method like flowcutter_decomposition that returns every tree decomposition flowcutter printed (bags and edges),
+    # ordered by decreasing width, so the last one is the best one (the latest of the smallest width). flowcutter_pace17
+    # prints a decomposition only when it gets SIGTERM, so there is usually one; solvers that print every improvement
+    # give more.
+    from . import flowcutter  # flowcutter and pace are only imported if flowcutter is used.
+    from . import pace
+    if stages is None:
+        stages = instrumentation.Stages(None)
+
+    # Save the graph as .gr file and run flowcutter on it until the stop rule holds. All tree decompositions are
+    # saved in one .td file, the best one last. Both files are taken from the cache if possible, so flowcutter only
+    # runs if the formula, flowcutter or the stop rule changed.
+    labels = pace.incidence_labels(clauses)
+    graph_key = cache.get_key("incidence graph", key)
+    stop_rule_parameters = [time_limit, plateau_time, target_width]
+    if time_per_node is not None:  # The keys of the fixed budget stay as they were.
+        stop_rule_parameters += [time_per_node, minimum_time]
+    td_key = cache.get_key("tree decomposition", key, cache.tool_digest(flowcutter_path), *stop_rule_parameters)
+
+    def write_graph(path_graph):
+        with stages.stage("graph"):
+            pace.write_incidence_graph(path_graph, clauses)
+
+    def compute_tree_decompositions(path_td):
+        path_graph = artifact_cache.get_file(graph_key, "graph.gr", directory, write_graph)
+        with stages.stage("flowcutter"):
+            stop_rule = flowcutter.StopRule(time_limit, plateau_time, target_width, time_per_node, minimum_time)
+            candidates = []
+            flowcutter.get_tree_decomposition([flowcutter_path], path_graph, stop_rule, len(labels),
+                                              candidates=candidates)
+            candidates.sort(key=lambda candidate: -candidate[2])  # Stable, ties keep the order of the output.
+            pace.write_tree_decompositions(path_td, [(bags, edges) for bags, edges, _ in candidates], len(labels))
+
+    path_td = artifact_cache.get_file(td_key, "decomposition.td", directory, compute_tree_decompositions)
+    with stages.stage("decomposition reading"):
+        tree_decompositions = pace.read_tree_decompositions_file(path_td)
+
+    # Translate the node ids of the tree decompositions into the labels of the nodes.
+    results = []
+    for tree_decomposition, edges, _ in tree_decompositions:
+        bags = []
+        for items in tree_decomposition:
+            bags.append(labels[[item - 1 for item in items]].tolist())
+        results.append((bags, edges))
+    return results
+
+
+def special_width(bags, edges, clauses, root_strategy):
+    # Method for the new special solution approach, which computes the width and the size of the new equivalent
+    # formula for a given one without building the formula.
+
+    # Transfer the given tree decomposition into a own data structure using the class Node and normalize it so
+    # that each node has only two children at most.
+    root, nodes = decomposition.get_nodes(bags, edges, root_strategy)
+    number_of_nodes = len(nodes)
+    decomposition.normalize(root, nodes)
+
+    # Count the variables and clauses the encoder would write. The depth and the width are computed in the same
+    # sweep.
+    depth = decomposition.Depth()
+    width = decomposition.Width()
+    counter = encoding.count(root, clauses, [depth, width])
+    return encoding.Statistics(root_strategy, depth.depth, len(nodes) - number_of_nodes, counter.auxiliary_variables,
+                               counter.clauses, width.width)
+
+
+def special_solving(bags, edges, clauses, root_strategy, stages=None, number_of_variables=None):
+    # Method for the new special solution approach, which computes an new equivalent formula for a given one. stages
+    # is the instrumentation.Stages of the file. The c-variables are numbered after number_of_variables (None means
+    # the largest variable of the clauses). Pass len(levels) - 1, so that no c-variable gets the number of a declared
+    # variable that does not occur in the clauses (get_protected_variables protects all declared universals).
+    if stages is None:
+        stages = instrumentation.Stages(None)
+
+    # Transfer the given tree decomposition into a own data structure using the class Node and normalize it so
+    # that each node has only two children at most.
+    with stages.stage("nodes"):
+        root, nodes = decomposition.get_nodes(bags, edges, root_strategy)
+        number_of_nodes = len(nodes)
+        decomposition.normalize(root, nodes)
+
+    # Using the encoder to calculate the new formula directly in cnf. The depth and the width are computed in the
+    # same sweep.
+    depth = decomposition.Depth()
+    width = decomposition.Width()
+    with stages.stage("encoding"):
+        formula = encoding.transform(root, clauses, [depth, width], number_of_variables)
+    statistics = encoding.Statistics(root_strategy, depth.depth, len(nodes) - number_of_nodes,
+                                     formula.number_of_variables() - formula.number_of_input_variables,
+                                     len(formula.clauses), width.width)
+    return formula, statistics
+
+
+def get_protected_variables(blocks, levels):  # Method that returns the universal variables of a formula.
+    protected_variables = set()
+    for variable in range(1, len(levels)):
+        if levels[variable] > 0 and blocks[levels[variable] - 1] == "a":
+            protected_variables.add(variable)
+    return protected_variables
+
+
+def unit_propagation(formula, protected_variables):  # Unit propagation can lead to an improvement of the result
+    formula.clauses, _, _ = propagation.unit_propagation(formula.clauses, formula.number_of_variables(),
+                                                         protected_variables)
+    return formula
+
+
+def variable_elimination(formula, max_length=None):
+    # Method that removes c-variables of a new formula by bounded variable elimination (see
+    # simplification.eliminate_variables). The c-variables are existential and quantified in the innermost block, the
+    # variables of the input formula are never eliminated. It returns the formula and the number of eliminated
+    # variables.
+    formula.clauses, eliminated = simplification.eliminate_variables(formula.clauses,
+                                                                     formula.number_of_input_variables + 1,
+                                                                     formula.number_of_variables(), max_length)
+    return formula, eliminated
+
+
+def get_prefix(blocks, levels, formula):
+    # Method that returns the blocks and the levels of the new formula. The variables of the input formula keep their
+    # blocks, the c-variables are existential and quantified in the innermost block.
+    new_blocks = list(blocks)
+    if not new_blocks or new_blocks[-1] != "e":
+        new_blocks.append("e")
+    input_variables = formula.number_of_input_variables
+    new_levels = levels[:input_variables + 1].tolist()
+    new_levels += [len(new_blocks)] * (formula.number_of_variables() - input_variables)
+    return new_blocks, new_levels
+
+
+def write_formula(path, blocks, levels, formula):
+    # Method to write a new formula in a qdimacs file. The writer drops empty blocks and numbers the variables that
+    # are left densely. It returns the number of variables of the file.
+    if any(len(clause) == 0 for clause in formula.clauses):
+        # A line with a single 0 is ignored by qdimacs.read_qdimacs (like by the old reader), so a formula with the
+        # empty clause is written as the false formula with the clauses x_1 and -x_1.
+        return qdimacs.write_qdimacs_file(path, ["e"], [0, 1], [[1], [-1]])
+    new_blocks, new_levels = get_prefix(blocks, levels, formula)
+    return qdimacs.write_qdimacs_file(path, new_blocks, new_levels, formula.clauses, compact=True)
@@ -0,0 +1,70 @@
+from . import pipeline  # This package provides the counting of the new formula.
+
+# The portfolio scores every pair of a candidate tree decomposition and a root strategy by the size of the new formula
+# (see pipeline.special_width, the formula is only counted) and keeps the cheapest pair. The objectives compare the
+# statistics lexicographically: WIDTH prefers the smallest width of the normalized tree decomposition, then the fewest
+# auxiliary variables and then the fewest clauses; SIZE prefers the fewest auxiliary variables, then the fewest
+# clauses and then the smallest width.
+WIDTH = "width"
+SIZE = "size"
+OBJECTIVES = [WIDTH, SIZE]
+
+
+class Candidate:  # The class Candidate is a tree decomposition of the portfolio with the name of its source.
+    def __init__(self, source, bags, edges):
+        self.source = source  # For example "flowcutter 2" (third output of flowcutter) or "min-fill".
+        self.bags = bags
+        self.edges = edges
+
+
+def get_cost(statistics, objective):  # Method that returns the sort key of the statistics of a pair.
+    if objective == WIDTH:
+        return statistics.width, statistics.auxiliary_variables, statistics.clauses
+    if objective == SIZE:
+        return statistics.auxiliary_variables, statistics.clauses, statistics.width
+    raise ValueError("unknown objective " + str(objective))
+
+
+# The candidates and the clauses are given to every process once (and not with every pair).
+shared = {}
+
+
+def initialize(candidates, clauses):
+    shared["candidates"] = candidates
+    shared["clauses"] = clauses
+
+
+def score(index, root_strategy):  # Method that counts the new formula of a candidate with a root strategy.
+    candidate = shared["candidates"][index]
+    return pipeline.special_width(candidate.bags, candidate.edges, shared["clauses"], root_strategy)
+
+
+def select(candidates, clauses, root_strategies, objective=WIDTH, processes=1):
+    # Method that scores all pairs of candidates and root strategies in processes parallel processes (None means one
+    # per cpu core) and returns the best candidate, its statistics (with the root strategy) and a list of the scores
+    # of all pairs (dictionaries of the source and the statistics). Ties are broken by the order of the candidates
+    # and the root strategies.
+    if not candidates:
+        raise ValueError("no candidates")
+    pairs = []
+    for index in range(len(candidates)):
+        for root_strategy in root_strategies:
+            pairs.append((index, root_strategy))
+    if processes == 1 or len(pairs) == 1:
+        initialize(candidates, clauses)
+        try:
+            results = [score(*pair) for pair in pairs]
+        finally:
+            shared.clear()
+    else:
+        import multiprocessing  # multiprocessing is only imported if the pairs are scored in parallel.
+        with multiprocessing.Pool(processes, initialize, (candidates, clauses)) as pool:
+            results = pool.starmap(score, pairs)
+
+    best = min(range(len(pairs)), key=lambda i: get_cost(results[i], objective))
+    scores = []
+    for (index, _), statistics in zip(pairs, results):
+        record = {"source": candidates[index].source}
+        record.update(statistics.to_dict())
+        scores.append(record)
+    return candidates[pairs[best][0]], results[best], scores
@@ -0,0 +1,85 @@
+def literal_index(literal):  # Method that maps the literals 1, -1, 2, -2, ... to the list indices 2, 3, 4, 5, ...
+    if literal > 0:
+        return 2 * literal
+    return 1 - 2 * literal
+
+
+def unit_propagation(clauses, number_of_variables, protected_variables):
+    # Method that applies unit propagation to a list of integer clauses with two watched literals per clause. The
+    # variables in protected_variables (the universal variables) are never assigned, so their literals never become
+    # false. It returns the simplified clauses (satisfied clauses removed, false literals removed), the trail of
+    # assigned literals in the order of assignment and whether a conflict was found. After a conflict the clauses
+    # are [[]], the unsatisfiable formula.
+    values = [0] * (number_of_variables + 1)  # 1 if the variable is true, -1 if it is false and 0 otherwise.
+    watches = [[] for _ in range(2 * number_of_variables + 2)]  # Clauses that watch a literal, by literal_index.
+    trail = []
+    conflict = False
+
+    def assign(literal):  # Returns False if the literal is already false.
+        value = values[abs(literal)]
+        if value == 0:
+            values[abs(literal)] = 1 if literal > 0 else -1
+            trail.append(literal)
+            return True
+        return (value > 0) == (literal > 0)
+
+    # The first two literals of each clause are watched, unit clauses are assigned directly.
+    clauses = [list(clause) for clause in clauses]
+    for clause in clauses:
+        if len(clause) == 0:
+            conflict = True
+        elif len(clause) == 1:
+            if abs(clause[0]) not in protected_variables and not assign(clause[0]):
+                conflict = True
+        else:
+            watches[literal_index(clause[0])].append(clause)
+            watches[literal_index(clause[1])].append(clause)
+
+    # Every literal of the trail is processed once: the clauses that watch its negation look for a new watch.
+    position = 0
+    while position < len(trail) and not conflict:
+        false_literal = -trail[position]
+        position += 1
+        watching = watches[literal_index(false_literal)]
+        kept = []
+        for index in range(len(watching)):
+            clause = watching[index]
+            if clause[0] == false_literal:
+                clause[0], clause[1] = clause[1], clause[0]
+            other = clause[0]
+            if values[abs(other)] != 0 and (values[abs(other)] > 0) == (other > 0):
+                kept.append(clause)  # The clause is satisfied by the other watch.
+                continue
+            for k in range(2, len(clause)):
+                literal = clause[k]
+                if values[abs(literal)] == 0 or (values[abs(literal)] > 0) == (literal > 0):
+                    clause[1], clause[k] = literal, false_literal
+                    watches[literal_index(literal)].append(clause)
+                    break
+            else:
+                kept.append(clause)
+                # All other literals are false, so the clause is unit or a conflict.
+                if abs(other) not in protected_variables and not assign(other):
+                    conflict = True
+                    kept.extend(watching[index + 1:])
+                    break
+        watches[literal_index(false_literal)] = kept
+
+    if conflict:
+        return [[]], trail, True
+
+    # Remove satisfied clauses and false literals.
+    simplified = []
+    for clause in clauses:
+        new_clause = []
+        satisfied = False
+        for literal in clause:
+            value = values[abs(literal)]
+            if value == 0:
+                new_clause.append(literal)
+            elif (value > 0) == (literal > 0):
+                satisfied = True
+                break
+        if not satisfied:
+            simplified.append(new_clause)
+    return simplified, trail, False
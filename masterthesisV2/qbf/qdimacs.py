@@ -0,0 +1,253 @@
+import itertools  # This package flattens lists of clauses.
+import mmap  # This package provides memory-mapped file access.
+import re  # This package provides regular expressions.
+import warnings  # This package provides control over warnings.
+
+import numpy as np  # This package provides compact arrays.
+
+CHUNK_SIZE = 1 << 22  # Number of bytes that are read and converted to integers at once.
+WRITE_BUFFER_SIZE = 1 << 22  # Size of the buffer of written qdimacs files in bytes.
+WRITE_CHUNK_SIZE = 1 << 20  # Number of literals that are converted to text at once.
+POWERS_OF_TEN = 10 ** np.arange(1, 19, dtype=np.int64)
+
+# Comment, problem and quantifier lines start with a letter, every other line contains clause data.
+SPECIAL_LINE = re.compile(rb"^[ \t]*[a-zA-Z%].*$", re.M)
+
+
+class ClauseStore:  # The class ClauseStore holds all clauses in one flat literal array with offsets (CSR format).
+    def __init__(self, literals, offsets):
+        self.literals = literals  # literals contains the literals of all clauses one after another.
+        self.offsets = offsets  # The literals of clause i are literals[offsets[i]:offsets[i + 1]].
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):  # Returns the literals of a clause as list of python integers.
+        if index < 0:
+            index += len(self)
+        return self.literals[self.offsets[index]:self.offsets[index + 1]].tolist()
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def number_of_variables(self):
+        if len(self.literals) == 0:
+            return 0
+        return int(np.abs(self.literals).max())
+
+
+def from_clauses(clauses):  # Method that builds a ClauseStore from a list of clauses.
+    lengths = [0]
+    literals = []
+    for clause in clauses:
+        lengths.append(len(clause))
+        literals.extend(clause)
+    return ClauseStore(np.array(literals, dtype=np.int32), np.cumsum(lengths, dtype=np.int64))
+
+
+def to_integers(data):  # Method that converts whitespace separated integers into an array.
+    with warnings.catch_warnings():
+        # numpy only warns if it can not read the string to its end, this is turned into an error.
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(data, dtype=np.int32, sep=" ")
+        except DeprecationWarning:
+            raise ValueError("invalid clause data in qdimacs input")
+
+
+def read_qdimacs(file):
+    # Method that reads a qdimacs formula from a binary file object. The input is read in chunks, and the clause data
+    # between the comment, problem and quantifier lines of a chunk is converted to integers at once. Clauses may span
+    # several lines and tokens may be separated by any whitespace. Lines that consist of a single 0 without an open
+    # clause are ignored as before.
+    blocks = []
+    block_variables = []
+    header_variables = 0
+    open_block = False  # True if the last quantifier line was not closed with 0 yet.
+    chunks = []
+    lengths = []
+    carry = np.zeros(0, dtype=np.int32)  # Literals of a clause that is not closed yet.
+
+    def add_clause_data(data):
+        nonlocal carry, open_block
+        if not data or data.isspace():
+            return
+        data = to_integers(data)
+        if open_block:  # The quantifier line is continued in the next lines.
+            ends = np.flatnonzero(data == 0)
+            if len(ends) == 0:
+                block_variables[-1].extend(data.tolist())
+                return
+            block_variables[-1].extend(data[:ends[0]].tolist())
+            data = data[ends[0] + 1:]
+            open_block = False
+        data = np.concatenate((carry, data))
+        ends = np.flatnonzero(data == 0)
+        if len(ends) == 0:
+            carry = data
+            return
+        complete = data[:ends[-1] + 1]
+        carry = data[ends[-1] + 1:]
+        clause_lengths = np.diff(ends, prepend=-1) - 1
+        chunks.append(complete[complete != 0])
+        lengths.append(clause_lengths[clause_lengths > 0])
+
+    def add_line(line):
+        nonlocal header_variables, open_block
+        split = line.split()
+        if split[0] == b"p":
+            header_variables = int(split[2])
+        elif split[0] == b"e" or split[0] == b"a":
+            blocks.append(split[0].decode())
+            block_variables.append([])
+            items = list(map(int, split[1:]))
+            open_block = not items or items[-1] != 0
+            if not open_block:
+                del items[-1]
+            block_variables[-1].extend(items)
+
+    rest = b""
+    while True:
+        data = file.read(CHUNK_SIZE)
+        if data:
+            data = rest + data
+            cut = data.rfind(b"\n") + 1
+            rest = data[cut:]
+            data = data[:cut]
+        else:
+            data = rest
+            rest = None
+        position = 0
+        for match in SPECIAL_LINE.finditer(data):
+            add_clause_data(data[position:match.start()])
+            add_line(match.group())
+            position = match.end()
+        add_clause_data(data[position:])
+        if rest is None:
+            break
+
+    if chunks:
+        literals = np.concatenate(chunks)
+        offsets = np.concatenate(([0], np.cumsum(np.concatenate(lengths))))
+    else:
+        literals = np.zeros(0, dtype=np.int32)
+        offsets = np.zeros(1, dtype=np.int64)
+    clauses = ClauseStore(literals, offsets.astype(np.int64))
+
+    # levels[i] is the number of the block (starting with 1) that quantifies x_i, or 0 if x_i is free.
+    number_of_variables = max(header_variables, clauses.number_of_variables())
+    for variables in block_variables:
+        for variable in variables:
+            if variable > number_of_variables:
+                number_of_variables = variable
+    levels = np.zeros(number_of_variables + 1, dtype=np.int32)
+    for i in range(len(block_variables)):
+        levels[block_variables[i]] = i + 1
+    return blocks, levels, clauses
+
+
+def read_qdimacs_file(path, use_mmap=False):  # Method to read a qdimacs file at a given path.
+    with open(path, "rb") as file:
+        if use_mmap:
+            try:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty files can not be mapped.
+                return read_qdimacs(file)
+            with mapped:
+                return read_qdimacs(mapped)
+        return read_qdimacs(file)
+
+
+def get_prefix(blocks, levels, variables):
+    # Method that returns the quantifier blocks of the given variables as pairs (quantifier, variables) in the order
+    # of the blocks. Blocks without any of the variables are dropped and neighbouring blocks with the same quantifier
+    # are merged. Variables with level 0 stay free.
+    variables = variables[levels[variables] > 0]
+    variables = variables[np.argsort(levels[variables], kind="stable")]
+    block_levels = levels[variables]
+    starts = np.flatnonzero(np.diff(block_levels, prepend=-1))
+    prefix = []
+    for start, end in zip(starts.tolist(), starts[1:].tolist() + [len(variables)]):
+        quantifier = blocks[block_levels[start] - 1]
+        if prefix and prefix[-1][0] == quantifier:
+            prefix[-1] = (quantifier, np.concatenate((prefix[-1][1], variables[start:end])))
+        else:
+            prefix.append((quantifier, variables[start:end]))
+    return prefix
+
+
+def get_literals(clauses):  # Method that returns the literals and the clause lengths of a ClauseStore or a list.
+    if isinstance(clauses, ClauseStore):
+        return clauses.literals, np.diff(clauses.offsets)
+    lengths = np.fromiter(map(len, clauses), dtype=np.int64, count=len(clauses))
+    literals = np.fromiter(itertools.chain.from_iterable(clauses), dtype=np.int32, count=int(lengths.sum()))
+    return literals, lengths
+
+
+def to_text(values):
+    # Method that converts an array of integers into text, every value is followed by a space and every 0 by a line
+    # break. Every value gets a row of a byte matrix that is filled one decimal place at a time for all values at
+    # once, the unused bytes in front of the values are dropped at the end.
+    magnitudes = np.abs(values)
+    digits = np.searchsorted(POWERS_OF_TEN, magnitudes, side="right") + 1
+    negative = values < 0
+    width = int(digits.max()) if len(values) else 0
+    matrix = np.empty((len(values), width + 2), dtype=np.uint8)  # Sign, digits and separator of every value.
+    for column in range(width, 0, -1):
+        magnitudes, remainders = np.divmod(magnitudes, 10)
+        matrix[:, column] = remainders
+    matrix[:, 1:width + 1] += ord("0")
+    starts = width - digits  # Column of the sign of every value.
+    matrix[np.flatnonzero(negative), starts[negative]] = ord("-")
+    matrix[:, width + 1] = np.where(values == 0, ord("\n"), ord(" "))
+    keep = np.arange(width + 2) >= (starts + 1 - negative)[:, None]
+    return matrix[keep].tobytes().decode("ascii")
+
+
+def write_clauses(file, literals, lengths):
+    # Method that writes the clauses about WRITE_CHUNK_SIZE literals at a time.
+    ends = np.cumsum(lengths)
+    position = 0
+    clause = 0
+    while clause < len(lengths):
+        last = max(int(np.searchsorted(ends, position + WRITE_CHUNK_SIZE, side="right")), clause + 1)
+        chunk = literals[position:ends[last - 1]]
+        file.write(to_text(np.insert(chunk, ends[clause:last] - position, 0)))
+        position = int(ends[last - 1])
+        clause = last
+
+
+def write_qdimacs(file, blocks, levels, clauses, compact=False):
+    # Method that writes a formula with the blocks and levels as returned by read_qdimacs to a text file object.
+    # clauses is a ClauseStore or a list of integer clauses. Empty blocks are dropped. If compact is True, only the
+    # variables that occur in the clauses are kept and they are numbered densely in the order of the blocks (free
+    # variables first). It returns the number of variables in the header.
+    literals, lengths = get_literals(clauses)
+    levels = np.asarray(levels)
+    if compact:
+        occurs = np.zeros(len(levels), dtype=bool)
+        occurs[np.abs(literals)] = True
+        variables = np.flatnonzero(occurs)
+    else:
+        variables = np.arange(1, len(levels), dtype=np.int64)
+    prefix = get_prefix(blocks, levels, variables)
+    number_of_variables = len(levels) - 1
+    if compact:
+        # Free variables come first, then the blocks from the outside to the inside.
+        order = np.concatenate([variables[levels[variables] == 0]] + [block for _, block in prefix])
+        numbers = np.zeros(len(levels), dtype=np.int32)
+        numbers[order] = np.arange(1, len(order) + 1, dtype=np.int32)
+        literals = np.where(literals > 0, numbers[np.abs(literals)], -numbers[np.abs(literals)])
+        prefix = [(quantifier, numbers[block]) for quantifier, block in prefix]
+        number_of_variables = len(order)
+    file.write("p cnf " + str(number_of_variables) + " " + str(len(lengths)) + "\n")
+    for quantifier, block in prefix:
+        file.write(quantifier + " " + to_text(np.append(block, 0)))
+    write_clauses(file, literals, lengths)
+    return number_of_variables
+
+
+def write_qdimacs_file(path, blocks, levels, clauses, compact=False):  # Method to write a qdimacs file at a given path.
+    with open(path, "w", buffering=WRITE_BUFFER_SIZE) as file:
+        return write_qdimacs(file, blocks, levels, clauses, compact)
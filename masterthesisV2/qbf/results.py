@@ -0,0 +1,144 @@
+import argparse  # This package provides the command line interface of the query command.
+import hashlib  # This package provides hash functions.
+import json  # This package provides the encoding of the result records.
+import math  # This package provides the logarithm for the geometric mean.
+import sqlite3  # This package provides the database of the results.
+import statistics  # This package provides the mean and the median.
+import sys  # This package provides access to the command line arguments.
+import time  # This package provides access to the system time.
+
+# Every result is one row, identified by the digest of the input files (instance_key) and the digest of the
+# configuration (config_key). record is the JSON encoded result of the instance.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    instance_key TEXT NOT NULL,
+    config_key TEXT NOT NULL,
+    instance TEXT NOT NULL,
+    config TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT NOT NULL,
+    time REAL NOT NULL,
+    record TEXT,
+    saved REAL NOT NULL,
+    PRIMARY KEY (instance_key, config_key)
+)
+"""
+
+
+def get_config_key(config):  # Method that returns the digest of a configuration dictionary.
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+class Store:  # The class Store is the SQLite database of the results of a test.
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def done(self, instance_key, config_key):  # Returns True if the instance has a result with status "ok".
+        row = self.connection.execute("SELECT status FROM results WHERE instance_key = ? AND config_key = ?",
+                                      (instance_key, config_key)).fetchone()
+        return row is not None and row[0] == "ok"
+
+    def get(self, instance_key, config_key):
+        # Method that returns the status, message, time and record of a result, or None.
+        row = self.connection.execute("SELECT status, message, time, record FROM results WHERE instance_key = ? "
+                                      "AND config_key = ?", (instance_key, config_key)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], row[2], None if row[3] is None else json.loads(row[3])
+
+    def put(self, instance, instance_key, config, status, message="", time_used=0.0, record=None):
+        # Method that saves the result of an instance (replacing an older one with the same keys) and commits it at
+        # once, so it survives an interrupted run.
+        config_json = json.dumps(config, sort_keys=True)
+        self.connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                (instance_key, get_config_key(config), instance, config_json, status, message,
+                                 time_used, None if record is None else json.dumps(record), time.time()))
+        self.connection.commit()
+
+
+def select(connection, fields, config_key=None, status="ok"):
+    # Method that returns the instance name and the given JSON paths (for example "$.width_primal") of the records.
+    # config_key may be a prefix of the configuration key.
+    query = "SELECT instance"
+    for _ in fields:
+        query += ", json_extract(record, ?)"
+    query += " FROM results WHERE status = ?"
+    parameters = list(fields) + [status]
+    if config_key is not None:
+        query += " AND config_key LIKE ?"
+        parameters.append(config_key + "%")
+    return connection.execute(query + " ORDER BY instance", parameters).fetchall()
+
+
+def describe(values):  # Method that returns the count, mean, median, minimum and maximum of a list of numbers.
+    if not values:
+        return {"count": 0}
+    return {"count": len(values), "mean": statistics.mean(values), "median": statistics.median(values),
+            "min": min(values), "max": max(values)}
+
+
+def aggregate(connection, field_a, field_b, config_key=None):
+    # Method that compares two fields of every record: the difference b - a (for example a width delta) and the
+    # ratio a / b (for example a speedup of runtime a over runtime b, summarized by the geometric mean).
+    deltas = []
+    ratios = []
+    for _, a, b in select(connection, [field_a, field_b], config_key):
+        if a is None or b is None:
+            continue
+        deltas.append(b - a)
+        if a > 0 and b > 0:
+            ratios.append(a / b)
+    result = {"delta": describe(deltas), "ratio": describe(ratios)}
+    if ratios:
+        result["ratio"]["geometric_mean"] = math.exp(statistics.mean([math.log(ratio) for ratio in ratios]))
+    return result
+
+
+def main(arguments):
+    # The query command, for example "python3 -m qbf.results test1*/results.sqlite aggregate '$.width_primal'
+    # '$.flowcutter[0].width'" in the directory masterthesisV2.
+    parser = argparse.ArgumentParser(description="Query a results database of the tests.")
+    parser.add_argument("database")
+    parser.add_argument("--config", help="only use the results of the configuration keys with this prefix")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list the instances with status and time")
+    command = commands.add_parser("fields", help="print JSON paths of the records for every instance")
+    command.add_argument("fields", nargs="+")
+    command = commands.add_parser("aggregate", help="aggregate the delta b - a and the ratio a / b of two fields")
+    command.add_argument("a")
+    command.add_argument("b")
+    commands.add_parser("export", help="print all results as JSON lines")
+    options = parser.parse_args(arguments)
+
+    connection = sqlite3.connect(options.database)
+    if options.command == "list":
+        query = "SELECT instance, config_key, status, time, message FROM results"
+        parameters = []
+        if options.config is not None:
+            query += " WHERE config_key LIKE ?"
+            parameters.append(options.config + "%")
+        for instance, config_key, status, time_used, message in connection.execute(query + " ORDER BY instance",
+                                                                                   parameters):
+            print(instance + " " + config_key[:12] + " " + status + " " + str(round(time_used, 3)) + " s "
+                  + message.strip().split("\n")[-1])
+    elif options.command == "fields":
+        for row in select(connection, options.fields, options.config):
+            print(" ".join(map(str, row)))
+    elif options.command == "aggregate":
+        print(json.dumps(aggregate(connection, options.a, options.b, options.config), indent=2))
+    else:
+        for row in connection.execute("SELECT instance_key, config_key, instance, config, status, message, time, "
+                                      "record FROM results ORDER BY instance"):
+            print(json.dumps({"instance_key": row[0], "config_key": row[1], "instance": row[2],
+                              "config": json.loads(row[3]), "status": row[4], "message": row[5], "time": row[6],
+                              "record": None if row[7] is None else json.loads(row[7])}))
+    connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,140 @@
+import heapq  # This package provides the queue of the variables, cheapest first.
+
+from .propagation import literal_index  # Occurrence lists are indexed like the watch lists of the unit propagation.
+
+# A variable is only tried if it occurs at most MAX_OCCURRENCES times positively and at most MAX_OCCURRENCES times
+# negatively, so the number of resolvents that are checked stays small.
+MAX_OCCURRENCES = 32
+
+
+def resolve(clause_a, clause_b, variable):
+    # Method that returns the resolvent of a clause with the literal variable and a clause with the literal -variable,
+    # or None if the resolvent is a tautology.
+    literals = set(clause_a)
+    literals.discard(variable)
+    resolvent = [literal for literal in clause_a if literal != variable]
+    for literal in clause_b:
+        if literal == -variable or literal in literals:
+            continue
+        if -literal in literals:
+            return None
+        literals.add(literal)
+        resolvent.append(literal)
+    return resolvent
+
+
+def get_gate(variable, positive, negative, clauses):
+    # Method that looks for a definition of variable as the disjunction of literals l_1, ..., l_k, given by the
+    # clauses (~p | l_1 | ... | l_k) and (p | ~l_i) for each i with p = variable or p = -variable (the encoder writes
+    # every c-variable like this). It returns the set of the indices of these clauses or None.
+    for pivot, binaries, definitions in ((variable, positive, negative), (-variable, negative, positive)):
+        partners = {}
+        for index in binaries:
+            clause = clauses[index]
+            if len(clause) == 2:
+                other = clause[1] if clause[0] == pivot else clause[0]
+                partners[-other] = index
+        for index in definitions:
+            gate = {index}
+            for literal in clauses[index]:
+                if literal == -pivot:
+                    continue
+                if literal not in partners:
+                    break
+                gate.add(partners[literal])
+            else:
+                return gate
+    return None
+
+
+def get_resolvents(variable, positive, negative, clauses, max_length):
+    # Method that returns the resolvents that replace the clauses of variable, or None if there are more of them than
+    # clauses of variable or one is longer than max_length (None means no bound at all). If variable is defined by a
+    # gate, only the resolvents of a gate clause and a clause outside of the gate are needed, the others are
+    # tautologies or implied by them.
+    gate = get_gate(variable, positive, negative, clauses)
+    bound = None if max_length is None else len(positive) + len(negative)
+    resolvents = []
+    for index_a in positive:
+        for index_b in negative:
+            if gate is not None and (index_a in gate) == (index_b in gate):
+                continue
+            resolvent = resolve(clauses[index_a], clauses[index_b], variable)
+            if resolvent is None:
+                continue
+            if bound is not None and (len(resolvents) == bound or len(resolvent) > max_length):
+                return None
+            resolvents.append(resolvent)
+    return resolvents
+
+
+def eliminate_variables(clauses, first_variable, number_of_variables, max_length=None, bounded=True):
+    # Method that applies bounded variable elimination to the variables first_variable to number_of_variables of a
+    # list of integer clauses: the clauses of a variable are replaced by their resolvents if this does not increase
+    # the number of clauses and no resolvent is longer than max_length (None means the longest clause of the input).
+    # This is only equivalent if the variables are existential and quantified in the innermost block, like the
+    # c-variables of the new formula. Every other variable is kept. If bounded is False, all these variables are
+    # eliminated without any bound (the number of clauses can grow exponentially, this is meant for small formulas).
+    # It returns the simplified clauses and the number of eliminated variables.
+    clauses = [list(clause) for clause in clauses]
+    alive = [True] * len(clauses)
+    if not bounded:
+        max_length = None
+    elif max_length is None:
+        max_length = max((len(clause) for clause in clauses), default=0)
+    occurrences = [[] for _ in range(2 * number_of_variables + 2)]  # Indices of the clauses of a literal.
+    for index in range(len(clauses)):
+        for literal in clauses[index]:
+            occurrences[literal_index(literal)].append(index)
+
+    def get_occurrences(literal):  # Method that returns the indices of the alive clauses of a literal.
+        indices = [index for index in occurrences[literal_index(literal)] if alive[index]]
+        occurrences[literal_index(literal)] = indices
+        return indices
+
+    # The variables with the fewest pairs of clauses are tried first. A variable is tried again when one of its
+    # clauses changed.
+    queue = []
+    queued = [False] * (number_of_variables + 1)
+    eliminated = [False] * (number_of_variables + 1)
+
+    def push(variable):
+        if not queued[variable] and not eliminated[variable]:
+            queued[variable] = True
+            cost = len(occurrences[literal_index(variable)]) * len(occurrences[literal_index(-variable)])
+            heapq.heappush(queue, (cost, variable))
+
+    for variable in range(first_variable, number_of_variables + 1):
+        push(variable)
+    number_of_eliminated = 0
+    while queue:
+        _, variable = heapq.heappop(queue)
+        queued[variable] = False
+        positive = get_occurrences(variable)
+        negative = get_occurrences(-variable)
+        if not positive and not negative:
+            continue
+        if bounded and (len(positive) > MAX_OCCURRENCES or len(negative) > MAX_OCCURRENCES):
+            continue
+        resolvents = get_resolvents(variable, positive, negative, clauses, max_length)
+        if resolvents is None:
+            continue
+
+        # Replace the clauses of the variable by the resolvents. The other variables of these clauses are tried
+        # again.
+        eliminated[variable] = True
+        number_of_eliminated += 1
+        touched = set()
+        for index in positive + negative:
+            alive[index] = False
+            touched.update(abs(literal) for literal in clauses[index])
+        for resolvent in resolvents:
+            for literal in resolvent:
+                occurrences[literal_index(literal)].append(len(clauses))
+            clauses.append(resolvent)
+            alive.append(True)
+        for other in touched:
+            if other >= first_variable:
+                push(other)
+
+    return [clauses[index] for index in range(len(clauses)) if alive[index]], number_of_eliminated
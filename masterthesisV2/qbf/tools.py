@@ -0,0 +1,91 @@
+import subprocess  # This package starts the tools with pipes.
+import threading  # This package provides the timer of the timeout.
+
+QRATPRE_OPTIONS = ["--print-formula"]  # Options of QRATPre+ to print the preprocessed formula.
+EXIT_CODES = (0, 10, 20)  # QBF tools exit with 10 for a true and 20 for a false formula.
+BUFFER_SIZE = 1 << 20  # Size of the pipe buffer in bytes.
+
+
+class ToolError(RuntimeError):  # The class ToolError is raised if a tool fails or exceeds its timeout.
+    def __init__(self, command, exit_code, timed_out):
+        self.command = command
+        self.exit_code = exit_code
+        self.timed_out = timed_out
+        if timed_out:
+            message = "timeout of " + command[0]
+        else:
+            message = command[0] + " failed with exit code " + str(exit_code)
+        super().__init__(message)
+
+
+class Tee:  # The class Tee is a binary file object that copies all data read from a source file into a second file.
+    def __init__(self, source, copy):
+        self.source = source
+        self.copy = copy
+
+    def read(self, size=-1):
+        data = self.source.read(size)
+        self.copy.write(data)
+        return data
+
+    def readline(self, size=-1):
+        line = self.source.readline(size)
+        self.copy.write(line)
+        return line
+
+    def __iter__(self):
+        return iter(self.readline, b"")
+
+
+def run(command, parse=None, output=None, timeout=None, exit_codes=EXIT_CODES):
+    # Method that starts a tool with its output connected to a pipe and returns parse(pipe), where parse reads the
+    # pipe as binary file object. If output is a path, the output is written to this file as well (without parse the
+    # output only goes to the file). The tool is killed after timeout seconds. A timeout or an exit code that is not
+    # in exit_codes raises a ToolError, also if parse failed on the incomplete output.
+    if parse is None and output is not None:
+        with open(output, "wb") as file:
+            process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=file)
+    else:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, bufsize=BUFFER_SIZE)
+    timed_out = []
+    timer = None
+    if timeout is not None:
+        def stop():
+            timed_out.append(True)
+            process.kill()
+        timer = threading.Timer(timeout, stop)
+        timer.start()
+    result = None
+    error = None
+    copy = None
+    try:
+        if process.stdout is not None:
+            with process.stdout:
+                reader = process.stdout
+                if output is not None:
+                    copy = open(output, "wb")
+                    reader = Tee(process.stdout, copy)
+                try:
+                    if parse is not None:
+                        result = parse(reader)
+                except Exception as exception:
+                    error = exception
+                while reader.read(BUFFER_SIZE):  # Drain the rest of the output, so the tool does not block.
+                    pass
+    finally:
+        if copy is not None:
+            copy.close()
+        exit_code = process.wait()
+        if timer is not None:
+            timer.cancel()
+    if timed_out or exit_code not in exit_codes:
+        raise ToolError(command, exit_code, len(timed_out) > 0) from error
+    if error is not None:
+        raise error
+    return result
+
+
+def qratpre(path_qratpre, path_input, parse=None, output=None, timeout=None):
+    # Method that preprocesses a qdimacs file with QRATPre+ (see run). For example parse=qdimacs.read_qdimacs reads
+    # the preprocessed formula directly from the pipe.
+    return run([path_qratpre] + QRATPRE_OPTIONS + [path_input], parse, output, timeout)
@@ -0,0 +1,221 @@
+import argparse  # This package provides the command line options of the worker.
+import collections  # This package provides the ordered dictionaries of the in-memory caches.
+import json  # This package provides the format of the requests and the responses.
+import os  # This package provides access to the operating system.
+import shutil  # This package provides removing of directory trees.
+import signal  # This package provides the signal that stops the socket server.
+import socketserver  # This package provides the Unix socket server.
+import sys  # This package provides standard input and output.
+import tempfile  # This package provides unique temporary directories.
+import time  # This package provides the wall clock.
+import traceback  # This package provides formatted exceptions.
+
+from . import cache  # This package provides the artifact cache.
+from . import decomposition  # This package provides the root strategies.
+from . import graphs  # This package provides the incidence graph.
+from . import instrumentation  # This package measures the stages of the requests.
+from . import pipeline  # This package provides the steps of the transformation.
+
+# The worker reads one request per line as a JSON object and writes one JSON line with the result for each request as
+# soon as it is done, in the order of the requests. The fields of a request are (only input is needed):
+#   id: any value, copied into the response.
+#   input: path of the qdimacs file.
+#   qratpre: path of QRATPre+ for the preprocessing, null for none (default: the option of the worker).
+#   decomposition: "heuristic" (elimination ordering heuristics, default) or "flowcutter".
+#   heuristics: list of elimination ordering heuristics (default: all of elimination.HEURISTICS).
+#   flowcutter, flowcutter_time, flowcutter_plateau_time, flowcutter_target_width, flowcutter_time_per_node,
+#     flowcutter_minimum_time: see the options of the worker.
+#   root_strategy: see decomposition.ROOT_STRATEGIES (default "cost").
+#   output: path of the new formula. Without output the new formula is only counted (like test 1).
+#   unit_propagation: true (default) or false, the new formula is simplified before it is written.
+#   variable_elimination: true or false (default), the c-variables are eliminated after the unit propagation (see
+#     qbf/simplification.py).
+#   postprocess: true or false (default), the new formula is written through QRATPre+ (like test 2 part A).
+# The response has the fields id, status ("ok" or "error"), time (seconds), record (the statistics of the new formula
+# and the stages of the request) or message (the error).
+HEURISTIC = "heuristic"
+FLOWCUTTER = "flowcutter"
+
+MEMORY_SIZE = 8  # Number of formulas and of tree decompositions that are kept in memory between the requests.
+
+
+class Memory:  # The class Memory keeps the last used values of a computation in memory (least recently used first).
+    def __init__(self, size):
+        self.size = size
+        self.values = collections.OrderedDict()
+
+    def get(self, key, compute):  # Method that returns the value of a key, compute() is only called if it is new.
+        if key in self.values:
+            self.values.move_to_end(key)
+            return self.values[key]
+        value = compute()
+        self.values[key] = value
+        if len(self.values) > self.size:
+            self.values.popitem(last=False)
+        return value
+
+
+class Worker:  # The class Worker handles the requests and keeps the caches warm between them.
+    def __init__(self, options):
+        self.options = options
+        self.artifact_cache = cache.Cache(options.cache, options.cache_size)
+        self.formulas = Memory(MEMORY_SIZE)
+        self.decompositions = Memory(MEMORY_SIZE)
+        os.makedirs(options.work, exist_ok=True)
+
+    def setting(self, request, name):  # Method that returns a setting of a request or the option of the worker.
+        return request.get(name, getattr(self.options, name))
+
+    def read(self, request, directory):
+        # Method that returns the formula of a request. Formulas are kept in memory as long as the input file and the
+        # preprocessing did not change.
+        path_input = request["input"]
+        qratpre_path = self.setting(request, "qratpre")
+        status = os.stat(path_input)
+        key = (os.path.abspath(path_input), status.st_size, status.st_mtime_ns, qratpre_path)
+        return self.formulas.get(key, lambda: pipeline.preprocess(path_input, directory, self.artifact_cache,
+                                                                  qratpre_path, None, self.options.keep_artifacts))
+
+    def decompose(self, request, directory, clauses, key, stages):
+        # Method that returns the bags and the edges of a tree decomposition of the bipartite graph of a formula.
+        method = request.get("decomposition", HEURISTIC)
+        if method == HEURISTIC:
+            heuristics = request.get("heuristics")
+
+            def compute():
+                with stages.stage("graph"):
+                    graph = graphs.get_incidence_graph(clauses)
+                with stages.stage("decomposition"):
+                    bags, edges, _ = pipeline.heuristic_decomposition(graph, heuristics)
+                return bags, edges
+            return self.decompositions.get((key, HEURISTIC, str(heuristics)), compute)
+        if method == FLOWCUTTER:
+            return pipeline.flowcutter_decomposition(directory, clauses, self.artifact_cache, key,
+                                                     self.setting(request, "flowcutter"),
+                                                     self.setting(request, "flowcutter_time"),
+                                                     self.setting(request, "flowcutter_plateau_time"),
+                                                     self.setting(request, "flowcutter_target_width"), stages,
+                                                     self.setting(request, "flowcutter_time_per_node"),
+                                                     self.setting(request, "flowcutter_minimum_time"))
+        raise ValueError("unknown decomposition " + str(method))
+
+    def transform(self, request, directory, stages):
+        # Method that computes the new formula of a request and returns its record.
+        with stages.stage("preprocessing"):
+            blocks, levels, clauses, key = self.read(request, directory)
+        bags, edges = self.decompose(request, directory, clauses, key, stages)
+        root_strategy = request.get("root_strategy", decomposition.ROOT_COST)
+        output = request.get("output")
+        if output is None:
+            with stages.stage("counting"):
+                return pipeline.special_width(bags, edges, clauses, root_strategy).to_dict()
+        formula, statistics = pipeline.special_solving(bags, edges, clauses, root_strategy, stages, len(levels) - 1)
+        record = statistics.to_dict()
+        if request.get("unit_propagation", True):
+            with stages.stage("unit propagation"):
+                formula = pipeline.unit_propagation(formula, pipeline.get_protected_variables(blocks, levels))
+            record["clauses_after_unit_propagation"] = len(formula.clauses)
+        if request.get("variable_elimination", False):
+            with stages.stage("variable elimination"):
+                formula, record["eliminated_variables"] = pipeline.variable_elimination(formula)
+            record["clauses_after_variable_elimination"] = len(formula.clauses)
+        with stages.stage("output"):
+            if request.get("postprocess", False):
+                from . import tools  # tools is only imported if QRATPre+ is used.
+                path_postprocessing = directory + "/postprocessed.qdimacs"
+                record["variables"] = pipeline.write_formula(path_postprocessing, blocks, levels, formula)
+                tools.qratpre(self.setting(request, "qratpre"), path_postprocessing, output=output)
+            else:
+                record["variables"] = pipeline.write_formula(output, blocks, levels, formula)
+        return record
+
+    def handle(self, line):  # Method that handles one request line and returns the response line.
+        start = time.perf_counter()
+        response = {"id": None}
+        directory = None
+        try:
+            request = json.loads(line)
+            response["id"] = request.get("id")
+            stages = instrumentation.Stages(response["id"])
+            directory = tempfile.mkdtemp(dir=self.options.work)
+            record = self.transform(request, directory, stages)
+            record["stages"] = stages.to_dict()
+            response["status"] = "ok"
+            response["record"] = record
+        except Exception:
+            response["status"] = "error"
+            response["message"] = traceback.format_exc()
+        finally:
+            if directory is not None and not self.options.keep_artifacts:
+                shutil.rmtree(directory, ignore_errors=True)
+        response["time"] = time.perf_counter() - start
+        return json.dumps(response) + "\n"
+
+    def serve(self, reader, writer):  # Method that answers the request lines of reader until it ends.
+        for line in reader:
+            if line.strip():
+                writer.write(self.handle(line))
+                writer.flush()
+
+
+class WriterAdapter:  # The class WriterAdapter writes text to a binary file object.
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, text):
+        self.file.write(text.encode())
+
+    def flush(self):
+        self.file.flush()
+
+
+def serve_socket(worker, path):
+    # Method that answers requests on a Unix socket at path. The connections are served one after another, every
+    # connection can send any number of requests.
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            reader = (line.decode() for line in self.rfile)
+            writer = WriterAdapter(self.wfile)
+            worker.serve(reader, writer)
+
+    if os.path.exists(path):
+        os.remove(path)
+    signal.signal(signal.SIGTERM, lambda number, frame: sys.exit(0))  # Remove the socket also if it is terminated.
+    with socketserver.UnixStreamServer(path, Handler) as server:
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(path)
+
+
+def main(arguments):
+    # The worker command, for example "python3 -m qbf.worker < requests.jsonl" or "python3 -m qbf.worker --socket
+    # worker.sock" in the directory masterthesisV2.
+    parser = argparse.ArgumentParser(description="Transform qdimacs files sent as JSON lines.")
+    parser.add_argument("--socket", help="serve on this Unix socket instead of standard input and output")
+    parser.add_argument("--cache", default="cache", help="directory of the artifact cache, empty for none")
+    parser.add_argument("--cache-size", type=int, default=10 * 1024 ** 3, help="size of the cache in bytes")
+    parser.add_argument("--work", default="work", help="directory of the intermediate files")
+    parser.add_argument("--keep-artifacts", action="store_true", help="keep the intermediate files")
+    parser.add_argument("--qratpre", help="path of QRATPre+, the formulas are not preprocessed without it")
+    parser.add_argument("--flowcutter", default="tools/flow-cutter-pace17/flow_cutter_pace17")
+    parser.add_argument("--flowcutter-time", type=float, default=30)
+    parser.add_argument("--flowcutter-plateau-time", type=float, default=5)
+    parser.add_argument("--flowcutter-target-width", type=int)
+    parser.add_argument("--flowcutter-time-per-node", type=float,
+                        help="seconds per graph node, flowcutter gets the minimum time plus this per node")
+    parser.add_argument("--flowcutter-minimum-time", type=float, default=1)
+    options = parser.parse_args(arguments)
+    if not options.cache:
+        options.cache = None
+    worker = Worker(options)
+    if options.socket is None:
+        output = sys.stdout
+        sys.stdout = sys.stderr  # Messages of the steps must not mix with the responses.
+        worker.serve(sys.stdin, output)
+    else:
+        serve_socket(worker, options.socket)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
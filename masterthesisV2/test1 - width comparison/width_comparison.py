@@ -1,322 +1,211 @@
-import networkx as nx  # This package provides graphs.
-import networkx.algorithms.approximation as app  # This package provides a tree decomposition heuristic.
-import pyeda.inter as eda  # This package provides boolean expression formulas.
 import os  # This package provides access to the operating system.
+import sys  # This package provides access to the module search path.
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from qbf import batch  # This package runs the input files in parallel processes.
+from qbf import cache  # This package provides the artifact cache.
+from qbf import decomposition  # This package provides the tree decomposition data structure.
+from qbf import elimination  # This package provides the elimination ordering heuristics.
+from qbf import graphs  # This package provides the primal and incidence graphs.
+from qbf import instrumentation  # This package measures the stages of the input files.
+from qbf import pipeline  # This package provides the steps of the transformation.
+from qbf import results  # This package provides the results database.
 
 RESULT_FILENAME = "result.txt"  # Change here to rename the result file.
 
-# Change the names here to change the name of the used bash scripts.
-PROCESSING_SCRIPT_NAME = "processing.sh"
-FLOWCUTTER_SCRIPT_NAME = "flowcutter.sh"
+# Every finished input file is saved at once in the database RESULTS_DATABASE_NAME, keyed by the content of the file
+# and the configuration. A restarted run skips the files that are already done, result.txt is written from the
+# database at the end. Query it with "python3 -m qbf.results" in the directory masterthesisV2.
+RESULTS_DATABASE_NAME = "results.sqlite"
 
-# Change the names here to use other directories or to change the name of the used bash scripts.
+# Change the names here to use other directories.
 INPUT_DIRECTORY_NAME = "input"
-PREPROCESSING_DIRECTORY_NAME = "preprocessing"
-GRAPH_DIRECTORY_NAME = "graphs"
-TREE_DECOMPOSITION_DIRECTORY_NAME = "decompositions"
 
-# Time (in seconds) that flowcutter uses for each calculation of a tree decomposition.
+# Each input file gets its own directory in WORK_DIRECTORY_NAME for the preprocessed formula, the graph and the tree
+# decomposition. These files are deleted after the file is done, unless KEEP_ARTIFACTS is True.
+WORK_DIRECTORY_NAME = "work"
+KEEP_ARTIFACTS = False
+
+# Time and memory of the stages of each file are saved in its result record. If TRACE_MEMORY is True, the peak of
+# the Python memory of each stage is recorded as well (slower). The cProfile output of the stage PROFILE_STAGE (for
+# example "encoding", None means no profile) of each file is saved in PROFILE_DIRECTORY_NAME.
+TRACE_MEMORY = False
+PROFILE_STAGE = None
+PROFILE_DIRECTORY_NAME = "profiles"
+
+# Preprocessed formulas, graphs and tree decompositions are kept in CACHE_DIRECTORY_NAME (shared by all tests) up to
+# a size of CACHE_SIZE bytes and reused as long as the input file, the tools and the parameters are the same. None
+# disables the cache.
+CACHE_DIRECTORY_NAME = "../cache"
+CACHE_SIZE = 10 * 1024 ** 3
+
+# Path of QRATPre+ and the time (in seconds) after which it is stopped, None means no limit. The content of QRATPre+
+# is part of the cache key.
+QRATPRE_PATH = "../tools/qratpreplus/qratpre+"
+QRATPRE_TIMEOUT = None
+
+# Number of input files that are handled at the same time, the time (in seconds) after which a file is aborted and
+# the memory (in bytes) that a file may use. None means one process per cpu core, no timeout or no memory limit.
+PROCESSES = None
+INSTANCE_TIMEOUT = 3600
+INSTANCE_MEMORY_LIMIT = None
+
+# Path of the flowcutter executable. Every other program that speaks the PACE 2017 format can be used instead.
+FLOWCUTTER_PATH = "../tools/flow-cutter-pace17/flow_cutter_pace17"
+
+# Maximal time (in seconds) that flowcutter uses for each calculation of a tree decomposition.
 FLOWCUTTER_TIME = 30
 
+# flowcutter is stopped earlier if the width did not improve for FLOWCUTTER_PLATEAU_TIME seconds or if a bag size of
+# at most FLOWCUTTER_TARGET_WIDTH is reached. None disables a rule.
+FLOWCUTTER_PLATEAU_TIME = 5
+FLOWCUTTER_TARGET_WIDTH = None
 
-class CVariable:  # The class CVariable represents a clause variable.
-    def __init__(self, clause_number, node_number, clause):
-        self.clause_number = clause_number
-        self.node_number = node_number
-        self.clause = list(clause)
-        self.variables = set()
-        for literal in clause:
-            self.variables.add("x_" + str(abs(literal)))
-
-    def __str__(self):
-        return "c_" + str(self.clause_number) + "_" + str(self.node_number)
-
-
-class Node:  # The class Node is a own tree decomposition node implementation.
-    def __init__(self, number, bag, clauses, parent=None):
-        self.number = number
-        self.parent = parent
-        self.children = []
-        self.bag_x = set()  # bag_x contains every x_i variable of the bag.
-        self.bag_c = set()  # bag_c contains every c_i_j variable of the bag.
-        for variable in bag:  # Each variable of the given bag is inserted into the corresponding set.
-            split = variable.split("_")
-            if split[0] == "c":
-                number = int(split[1])
-                self.bag_c.add(CVariable(number, self.number, clauses[number - 1]))
-            else:
-                self.bag_x.add(variable)
-
-    def is_root(self):
-        return self.parent is None
-
-    def bag(self):
-        bag = set(self.bag_x)
-        for variable in self.bag_c:
-            bag.add(str(variable))
-        return bag
-
-    def introduced_x(self, variable):
-        introduced = self.bag_x.intersection(variable.variables)
-        for child in self.children:
-            if child.get_variable(variable.clause_number):
-                introduced.difference(child.bag_x)
-        return introduced
-
-    def get_variable(self, number):
-        for variable in self.bag_c:
-            if variable.clause_number == number:
-                return variable
-        return None
-
-    def transform(self, formula=eda.expr(True)):
-        # This is a recursive method to traverse the tree decomposition nodes in post order and build the new formula.
-
-        # First the child nodes of the node are visited because of the post order traversal.
-        for child in self.children:
-            formula = child.transform(formula)
-
-        # For each c-variable of the node a new "clause" is built, by which formula is extended.
-        for variable in self.bag_c:
-            expression = eda.expr(False)
-            c_counter = 0
-            c_save = None
-            for child in self.children:
-                child_variable = child.get_variable(variable.clause_number)
-                if child_variable:
-                    expression = expression | eda.exprvar(str(child_variable))
-                    c_counter += 1
-                    c_save = child_variable
-            l_counter = 0
-            for literal in variable.clause:
-                x_var = "x_" + str(abs(literal))
-                if x_var in self.introduced_x(variable):
-                    l_counter += 1
-                    if literal > 0:
-                        expression = expression | eda.exprvar(x_var)
-                    else:
-                        expression = expression | (~ eda.exprvar(x_var))
-            if c_counter == 1 and l_counter == 0:
-                variable.node_number = c_save.node_number
-            else:
-                formula = formula & eda.Equal(eda.exprvar(str(variable)), expression)
-
-        # Close a clause by closing the last clause variable positively.
-        for variable in self.bag_c:
-            if self.parent:
-                if not self.parent.get_variable(variable.clause_number):
-                    formula = formula & eda.exprvar(str(variable))
-            else:
-                formula = formula & eda.exprvar(str(variable))
-
-        return formula
-
-    def width(self):
-        width = len(self.bag_x) + len(self.bag_c) - 1
-        for child in self.children:
-            child_width = child.width()
-            if child_width > width:
-                width = child_width
-        return width
-
-
-def read_qdimacs_file(basename):  # Method to read a qdimacs file at a given path.
-    path_input = INPUT_DIRECTORY_NAME + "/" + basename + ".qdimacs"
-    path_preprocessing = PREPROCESSING_DIRECTORY_NAME + "/" + basename + "_preprocessed.qdimacs"
-
-    # Preprocessing the input file to achieve an improvement of the result.
-    os.system("sh " + PROCESSING_SCRIPT_NAME + " " + path_input + " " + path_preprocessing)
-
-    blocks = []
-    variables = {}
-    clauses = []
-    with open(path_preprocessing, "r") as file:
-        for line in file:
-            split = line.strip().split(" ")
-            if split[0] == 'c' or split[0] == 'p' or split[0] == '0':
-                continue
-            elif split[0] == 'e' or split[0] == 'a':
-                blocks.append(split[0])
-                del split[-1]
-                del split[0]
-                for item in split:
-                    variables["x_" + item] = len(blocks)
-            else:
-                del split[-1]
-                clause = set(map(int, split))
-                clauses.append(clause)
-    return blocks, variables, clauses
-
-
-def get_primalgraph(clauses):  # Build the primalgraph of a given formula.
-    primalgraph = nx.Graph()
-    for clause in clauses:
-        clause_as_list = list(clause)
-        for i in range(len(clause)):
-            for j in range(i+1, len(clause)):
-                primalgraph.add_edge("x_" + str(abs(clause_as_list[i])), "x_" + str(abs(clause_as_list[j])))
-    return primalgraph
-
-
-def get_bipartite_graph(clauses):  # Build the bipartite graph of a given formula.
-    bipartite_graph = nx.Graph()
-    for clause in clauses:
-        for literal in clause:
-            bipartite_graph.add_edge("c_" + str(clauses.index(clause) + 1), "x_" + str(abs(literal)))
-    return bipartite_graph
-
-
-def write_graph_to_file(path, graph):  # Method that saves a given graph in a .gr file.
-    nodes = list(graph.nodes)
-    edges = list(graph.edges)
-    with open(path, "w") as file:
-        file.write("p tw " + str(len(nodes)) + " " + str(len(edges)) + "\n")
-        for edge in edges:
-            file.write(str(nodes.index(edge[0]) + 1) + " " + str(nodes.index(edge[1]) + 1) + "\n")
-    variable_dictionary = {}
-    for node in nodes:
-        variable_dictionary[nodes.index(node) + 1] = str(node)
-    return variable_dictionary
-
-
-def get_networkx_tree_decomposition(graph):
-    # Method that computes a tree decomposition of a given graph using the min-fill heuristic implemented in the
-    # pyeda package.
-    _, tree_decomposition = app.treewidth_min_fill_in(graph)
-    bags = list(map(set, tree_decomposition.nodes()))
-    edges = []
-    for edge in tree_decomposition.edges():
-        edges.append((bags.index(set(edge[0])), bags.index(set(edge[1]))))
-    return bags, edges
-
-
-def get_flowcutter_tree_decomposition(basename, graph):
-    # Method that computes a tree decomposition of a given graph using flowcutter.
-
-    # Save the graph as .gr file and use flowcutter to compute a tree decomposition saved in a .gr file.
-    path_graph = GRAPH_DIRECTORY_NAME + "/" + basename + ".gr"
-    path_td = TREE_DECOMPOSITION_DIRECTORY_NAME + "/" + basename + "_td.gr"
-    variable_dictionary = write_graph_to_file(path_graph, graph)
-    os.system("sh " + FLOWCUTTER_SCRIPT_NAME + " " + path_graph + " " + path_td + " " + str(FLOWCUTTER_TIME))
-
-    # Read the calculated tree decomposition from file.
-    bags = []
-    edges = []
-    with open(path_td, "r") as file:
-        for line in file:
-            split = line.strip().split(" ")
-            if split[0] == 'c' or split[0] == 's':
-                continue
-            elif split[0] == 'b':
-                del split[0]
-                del split[0]
-                bag = set()
-                for item in split:
-                    bag.add(variable_dictionary[int(item)])
-                bags.append(bag)
-            else:
-                edges.append((int(split[0]) - 1, int(split[1]) - 1))
-    return bags, edges
-
-
-def special_solving(bags, edges, clauses):
-    # Method for the new special solution approach, which computes an new equivalent formula for a given one.
-
-    # Transfer the given tree decomposition into a own data structure using the class Node.
-    nodes = []
-    for i in range(len(bags)):
-        nodes.append(Node(i + 1, bags[i], clauses))
-    edges = list(edges)
-    queue = [0]
-    while queue:
-        index = queue.pop()
-        for edge in list(edges):
-            i = -1
-            if edge[1] == index:
-                i = 0
-            elif edge[0] == index:
-                i = 1
-            if i > -1:
-                nodes[index].children.append(nodes[edge[i]])
-                nodes[edge[i]].parent = nodes[index]
-                queue.append(edge[i])
-                edges.remove(edge)
-    root = nodes[0]
-
-    # Normalize the tree decomposition so that each node has only two children at most.
-    queue = [root]
-    while queue:
-        node = queue.pop()
-        size = len(node.children)
-        if size == 3:
-            clone = Node(len(nodes) + 1, node.bag(), clauses, node)
-            nodes.append(clone)
-            clone.children.append(node.children[0])
-            node.children[0].parent = clone
-            clone.children.append(node.children[1])
-            node.children[1].parent = clone
-            node.children = [clone, node.children[2]]
-        elif size > 3:
-            clone1 = Node(len(nodes) + 1, node.bag(), clauses, node)
-            nodes.append(clone1)
-            clone2 = Node(len(nodes) + 1, node.bag(), clauses, node)
-            nodes.append(clone2)
-            for child in node.children[:size // 2]:
-                clone1.children.append(child)
-                child.parent = clone1
-            for child in node.children[size // 2:]:
-                clone2.children.append(child)
-                child.parent = clone2
-            node.children = [clone1, clone2]
-        queue.extend(node.children)
-
-    # Using the transform method of the root to calculate the new formula and convert it into cnf.
-    formula = root.transform(clauses).to_cnf()
-    width = root.width()
-    return formula, width
-
-
-def write_result(basename, width_pg, width_bg_nx, width_bg_fc):  # Save results in the result file.
+# If FLOWCUTTER_TIME_PER_NODE is set, flowcutter gets FLOWCUTTER_MINIMUM_TIME plus FLOWCUTTER_TIME_PER_NODE seconds per
+# node of the graph (but never more than FLOWCUTTER_TIME), so small graphs do not wait for the whole time.
+FLOWCUTTER_TIME_PER_NODE = None
+FLOWCUTTER_MINIMUM_TIME = 1
+
+# Elimination ordering heuristics (see elimination.HEURISTICS) for the primal graph and the bipartite graph. Every
+# heuristic runs with ELIMINATION_SEEDS random tie-breaks in ELIMINATION_PROCESSES parallel processes (None means one
+# per cpu core) and the smallest width is kept. The input files are already handled in parallel, so set PROCESSES to
+# 1 before using all cores for the heuristics.
+ELIMINATION_HEURISTICS = elimination.HEURISTICS
+ELIMINATION_SEEDS = 1
+ELIMINATION_PROCESSES = 1
+
+# Strategies to choose the root of the tree decompositions (see decomposition.ROOT_STRATEGIES). The transformation
+# is counted once for each strategy to show how the choice affects the depth, the clones and the auxiliary variables.
+ROOT_STRATEGIES = decomposition.ROOT_STRATEGIES
+
+
+def get_heuristic_tree_decomposition(graph):
+    # Method that computes a tree decomposition of a given graph using the elimination ordering heuristics. The bags
+    # contain the labels of the nodes.
+    return pipeline.heuristic_decomposition(graph, ELIMINATION_HEURISTICS, ELIMINATION_SEEDS, ELIMINATION_PROCESSES)
+
+
+def compare_roots(bags, edges, clauses):  # Method that computes the statistics once for each root strategy.
+    statistics = []
+    for root_strategy in ROOT_STRATEGIES:
+        statistics.append(pipeline.special_width(bags, edges, clauses, root_strategy))
+    return statistics
+
+
+def get_config():  # Method that returns the settings that the results depend on.
+    return {"test": "width comparison", "qratpre": cache.tool_digest(QRATPRE_PATH),
+            "flowcutter": cache.tool_digest(FLOWCUTTER_PATH), "flowcutter_time": FLOWCUTTER_TIME,
+            "flowcutter_plateau_time": FLOWCUTTER_PLATEAU_TIME, "flowcutter_target_width": FLOWCUTTER_TARGET_WIDTH,
+            "flowcutter_time_per_node": FLOWCUTTER_TIME_PER_NODE, "flowcutter_minimum_time": FLOWCUTTER_MINIMUM_TIME,
+            "elimination_heuristics": ELIMINATION_HEURISTICS, "elimination_seeds": ELIMINATION_SEEDS,
+            "root_strategies": ROOT_STRATEGIES}
+
+
+def write_result(basename, record):  # Save results in the result file.
     with open(RESULT_FILENAME, "a") as file:
         file.write("RESULTS OF " + basename + ".qdimacs:\n")
-        file.write("width of primalgraph: " + str(width_pg) + "\n")
-        file.write("width of networkx bipartite graph after transformation: " + str(width_bg_nx) + "\n")
-        file.write("width of flowcutter bipartite graph after transformation: " + str(width_bg_fc) + "\n")
+        file.write("width of primalgraph: " + str(record["width_primal"]) + "\n")
+        file.write("width of heuristic bipartite graph after transformation: " + str(record["heuristic"][0]["width"])
+                   + "\n")
+        file.write("width of flowcutter bipartite graph after transformation: "
+                   + str(record["flowcutter"][0]["width"]) + "\n")
+        for name in ("heuristic", "flowcutter"):
+            for statistics in record[name]:
+                file.write(name + " bipartite graph with root strategy " + statistics["root_strategy"] + ": depth "
+                           + str(statistics["depth"]) + ", " + str(statistics["clones"]) + " clones, "
+                           + str(statistics["auxiliary_variables"]) + " auxiliary variables, "
+                           + str(statistics["clauses"]) + " clauses, width " + str(statistics["width"]) + "\n")
         file.write("\n")
 
 
-def main():
-    file = open(RESULT_FILENAME, "w")  # Clear the result file.
-    file.close()
+def write_error(basename, status, message):  # Save an aborted file in the result file.
+    with open(RESULT_FILENAME, "a") as file:
+        file.write("RESULTS OF " + basename + ".qdimacs:\n")
+        file.write("aborted (" + status + "): " + message.strip().split("\n")[-1] + "\n")
+        file.write("\n")
+
 
+def process_file(directory, basename):
+    # Method that calculates the results of one input file. Intermediate files are saved in directory. It returns
+    # the result record of the file.
+    print("start " + basename + ".")
+
+    # Read the qdimacs input file and build both the primalgraph and the bipartite graph.
+    stages = instrumentation.Stages(basename, TRACE_MEMORY, PROFILE_STAGE, PROFILE_DIRECTORY_NAME)
+    artifact_cache = cache.Cache(CACHE_DIRECTORY_NAME, CACHE_SIZE)
+    with stages.stage("preprocessing"):
+        blocks, levels, clauses, key = pipeline.preprocess(INPUT_DIRECTORY_NAME + "/" + basename + ".qdimacs",
+                                                           directory, artifact_cache, QRATPRE_PATH, QRATPRE_TIMEOUT,
+                                                           KEEP_ARTIFACTS)
+    with stages.stage("graphs"):
+        primalgraph = graphs.get_primal_graph(clauses)
+        bipartite_graph = graphs.get_incidence_graph(clauses)
+    with stages.stage("primal decomposition"):
+        _, _, width_pg = get_heuristic_tree_decomposition(primalgraph)  # Calculate the width of the primalgraph.
+    print("computed graphs of " + basename + ".")
+
+    # Get the width of a tree decomposition of the bipartite graph by using the elimination ordering heuristics.
+    with stages.stage("heuristic decomposition"):
+        bags, edges, _ = get_heuristic_tree_decomposition(bipartite_graph)
+    with stages.stage("heuristic transformation"):
+        statistics_el = compare_roots(bags, edges, clauses)
+    print("computed width of bipartite graph of " + basename + " using the heuristics.")
+
+    # Get the width of a tree decomposition of the bipartite graph by using flowcutter.
+    bags, edges = pipeline.flowcutter_decomposition(directory, clauses, artifact_cache, key, FLOWCUTTER_PATH,
+                                                    FLOWCUTTER_TIME, FLOWCUTTER_PLATEAU_TIME, FLOWCUTTER_TARGET_WIDTH,
+                                                    stages, FLOWCUTTER_TIME_PER_NODE, FLOWCUTTER_MINIMUM_TIME)
+    with stages.stage("flowcutter transformation"):
+        statistics_fc = compare_roots(bags, edges, clauses)
+    print("computed width of bipartite graph of " + basename + " using flowcutter.")
+    print("stages of " + basename + ": " + str(stages) + ".")
+    return {"width_primal": width_pg, "heuristic": [statistics.to_dict() for statistics in statistics_el],
+            "flowcutter": [statistics.to_dict() for statistics in statistics_fc], "stages": stages.to_dict()}
+
+
+def main():
+    basenames = []
     for _, _, files in os.walk("./" + INPUT_DIRECTORY_NAME):  # Calculate results for each file in the input directory.
         for filename in files:
             split = filename.split(".")
             del split[-1]
-            basename = ".".join(split)
-            print("start " + filename + ".")
-
-            # Read the qdimacs input file and build both the primalgraph and the bipartite graph.
-            blocks, variables, clauses = read_qdimacs_file(basename)
-            primalgraph = get_primalgraph(clauses)
-            width_pg, _ = app.treewidth_min_fill_in(primalgraph)  # Calculate the width of the primalgraph.
-            bipartite_graph = get_bipartite_graph(clauses)
-            print("computed graphs.")
-
-            # Get the width of a tree decomposition of the bipartite graph by using the min-fill heuristic
-            # given by networkx.
-            bags, edges = get_networkx_tree_decomposition(bipartite_graph)
-            _, width_bg_nx = special_solving(bags, edges, clauses)
-            print("computed width of bipartite graph using networkx.")
-
-            # Get the width of a tree decomposition of the bipartite graph by using flowcutter.
-            bags, edges = get_flowcutter_tree_decomposition(basename, bipartite_graph)
-            _, width_bg_fc = special_solving(bags, edges, clauses)
-            print("computed width of bipartite graph using flowcutter.")
-
-            # Write results in result file.
-            write_result(basename, width_pg, width_bg_nx, width_bg_fc)
-            print(filename + " done.")
+            basenames.append(".".join(split))
+    basenames.sort()
+
+    # Only the files without a result for the current configuration are handled.
+    store = results.Store(RESULTS_DATABASE_NAME)
+    config = get_config()
+    config_key = results.get_config_key(config)
+    instance_keys = {}
+    instances = []
+    for basename in basenames:
+        instance_keys[basename] = cache.file_digest(INPUT_DIRECTORY_NAME + "/" + basename + ".qdimacs")
+        if store.done(instance_keys[basename], config_key):
+            print(basename + ".qdimacs already done.")
+        else:
+            instances.append((basename,))
+
+    # The files are handled in parallel, each result is saved as soon as the file is done.
+    def save(index, result):
+        basename = instances[index][0]
+        store.put(basename, instance_keys[basename], config, result.status, result.message, result.time,
+                  result.value)
+        print(basename + ".qdimacs " + result.status + ".")
+
+    batch.run(process_file, instances, PROCESSES, INSTANCE_TIMEOUT, INSTANCE_MEMORY_LIMIT, WORK_DIRECTORY_NAME,
+              KEEP_ARTIFACTS, save)
+
+    # Write the result file in the order of basenames.
+    file = open(RESULT_FILENAME, "w")  # Clear the result file.
+    file.close()
+    for basename in basenames:
+        status, message, _, record = store.get(instance_keys[basename], config_key)
+        if status == "ok":
+            write_result(basename, record)
+        else:
+            write_error(basename, status, message)
+    store.close()
 
 
-main()
+if __name__ == "__main__":
+    main()
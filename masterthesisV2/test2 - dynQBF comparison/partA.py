@@ -1,332 +1,226 @@
-import networkx as nx  # This package provides graphs.
-import pyeda.inter as eda  # This package provides boolean expression formulas.
 import os  # This package provides access to the operating system.
-
-# Change the names here to use other directories or to change the name of the used bash scripts.
+import sys  # This package provides access to the module search path.
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from qbf import batch  # This package runs the input files in parallel processes.
+from qbf import cache  # This package provides the artifact cache.
+from qbf import decomposition  # This package provides the tree decomposition data structure.
+from qbf import elimination  # This package provides the elimination ordering heuristics.
+from qbf import graphs  # This package provides the incidence graph.
+from qbf import instrumentation  # This package measures the stages of the input files.
+from qbf import pipeline  # This package provides the steps of the transformation.
+from qbf import portfolio  # This package selects the tree decomposition with the smallest new formula.
+from qbf import results  # This package provides the results database.
+from qbf import tools  # This package runs QRATPre+ with pipes.
+
+# Change the names here to use other directories.
 INPUT_DIRECTORY_NAME = "input"
 OUTPUT_DIRECTORY_NAME = "input_new"
-PREPROCESSING_DIRECTORY_NAME = "preprocessing"
-POSTPROCESSING_DIRECTORY_NAME = "postprocessing"
-GRAPH_DIRECTORY_NAME = "graphs"
-TREE_DECOMPOSITION_DIRECTORY_NAME = "decompositions"
-FLOWCUTTER_SCRIPT_NAME = "flowcutter.sh"
-PROCESSING_SCRIPT_NAME = "processing.sh"
-
-# Time (in seconds) that flowcutter gets for each calculation of a tree decomposition.
-FLOWCUTTER_TIME = 30
 
+# Every finished input file is saved at once in the database RESULTS_DATABASE_NAME, keyed by the content of the file
+# and the configuration. A restarted run skips the files that are already done and whose new formula exists.
+RESULTS_DATABASE_NAME = "results_partA.sqlite"
+
+# Each input file gets its own directory in WORK_DIRECTORY_NAME for the preprocessed and postprocessed formulas, the
+# graph and the tree decomposition. These files are deleted after the file is done, unless KEEP_ARTIFACTS is True.
+WORK_DIRECTORY_NAME = "work"
+KEEP_ARTIFACTS = False
+
+# Time and memory of the stages of each file are saved in its result record. If TRACE_MEMORY is True, the peak of
+# the Python memory of each stage is recorded as well (slower). The cProfile output of the stage PROFILE_STAGE (for
+# example "encoding", None means no profile) of each file is saved in PROFILE_DIRECTORY_NAME.
+TRACE_MEMORY = False
+PROFILE_STAGE = None
+PROFILE_DIRECTORY_NAME = "profiles"
+
+# Preprocessed formulas, graphs and tree decompositions are kept in CACHE_DIRECTORY_NAME (shared by all tests) up to
+# a size of CACHE_SIZE bytes and reused as long as the input file, the tools and the parameters are the same. None
+# disables the cache.
+CACHE_DIRECTORY_NAME = "../cache"
+CACHE_SIZE = 10 * 1024 ** 3
+
+# Path of QRATPre+ and the time (in seconds) after which it is stopped, None means no limit. The content of QRATPre+
+# is part of the cache key.
+QRATPRE_PATH = "../tools/qratpreplus/qratpre+"
+QRATPRE_TIMEOUT = None
+
+# Number of input files that are handled at the same time, the time (in seconds) after which a file is aborted and
+# the memory (in bytes) that a file may use. None means one process per cpu core, no timeout or no memory limit.
+PROCESSES = None
+INSTANCE_TIMEOUT = 3600
+INSTANCE_MEMORY_LIMIT = None
+
+# Path of the flowcutter executable. Every other program that speaks the PACE 2017 format can be used instead.
+FLOWCUTTER_PATH = "../tools/flow-cutter-pace17/flow_cutter_pace17"
+
+# Maximal time (in seconds) that flowcutter gets for each calculation of a tree decomposition.
+FLOWCUTTER_TIME = 30
 
-class CVariable:  # The class CVariable represents a clause variable.
-    def __init__(self, clause_number, node_number, clause):
-        self.clause_number = clause_number
-        self.node_number = node_number
-        self.clause = list(clause)
-        self.variables = set()
-        for literal in clause:
-            self.variables.add("x_" + str(abs(literal)))
-
-    def __str__(self):
-        return "c_" + str(self.clause_number) + "_" + str(self.node_number)
-
-
-class Node:  # The class Node is my own tree decomposition node implementation.
-    def __init__(self, number, bag, clauses, parent=None):
-        self.number = number
-        self.parent = parent
-        self.children = []
-        self.bag_x = set()  # bag_x contains every x_i variable of the bag.
-        self.bag_c = set()  # bag_c contains every c_i_j variable of the bag.
-        for variable in bag:  # Each variable of the given bag is inserted into the corresponding set.
-            split = variable.split("_")
-            if split[0] == "c":
-                number = int(split[1])
-                self.bag_c.add(CVariable(number, self.number, clauses[number - 1]))
-            else:
-                self.bag_x.add(variable)
-
-    def is_root(self):
-        return self.parent is None
-
-    def bag(self):
-        bag = set(self.bag_x)
-        for variable in self.bag_c:
-            bag.add(str(variable))
-        return bag
-
-    def introduced_x(self, variable):
-        introduced = self.bag_x.intersection(variable.variables)
-        for child in self.children:
-            if child.get_variable(variable.clause_number):
-                introduced.difference(child.bag_x)
-        return introduced
-
-    def get_variable(self, number):
-        for variable in self.bag_c:
-            if variable.clause_number == number:
-                return variable
-        return None
-
-    def transform(self, formula=eda.expr(True)):
-        # This is a recursive method to traverse the tree decomposition nodes in post order and build the new formula.
-
-        # First the child nodes of the node are visited because of the post order traversal.
-        for child in self.children:
-            formula = child.transform(formula)
-
-        # For each c-variable of the node a new "clause" is built, by which formula is extended.
-        for variable in self.bag_c:
-            expression = eda.expr(False)
-            c_counter = 0
-            c_save = None
-            for child in self.children:
-                child_variable = child.get_variable(variable.clause_number)
-                if child_variable:
-                    expression = expression | eda.exprvar(str(child_variable))
-                    c_counter += 1
-                    c_save = child_variable
-            l_counter = 0
-            for literal in variable.clause:
-                x_var = "x_" + str(abs(literal))
-                if x_var in self.introduced_x(variable):
-                    l_counter += 1
-                    if literal > 0:
-                        expression = expression | eda.exprvar(x_var)
-                    else:
-                        expression = expression | (~ eda.exprvar(x_var))
-            if c_counter == 1 and l_counter == 0:
-                variable.node_number = c_save.node_number
-            else:
-                formula = formula & eda.Equal(eda.exprvar(str(variable)), expression)
-
-        # Close a clause by closing the last clause variable positively.
-        for variable in self.bag_c:
-            if self.parent:
-                if not self.parent.get_variable(variable.clause_number):
-                    formula = formula & eda.exprvar(str(variable))
-            else:
-                formula = formula & eda.exprvar(str(variable))
-
-        return formula
-
-
-def processing(path_input, path_output):  # Processing a .qdimacs file can lead to an improvement of the result
-    os.system("sh " + PROCESSING_SCRIPT_NAME + " " + path_input + " " + path_output)
-
-
-def read_qdimacs_file(basename):  # Method to read a qdimacs file at a given path.
-    path_input = INPUT_DIRECTORY_NAME + "/" + basename + ".qdimacs"
-    path_preprocessing = PREPROCESSING_DIRECTORY_NAME + "/" + basename + "_preprocessed.qdimacs"
-
-    # Preprocessing the input file to achieve an improvement of the result.
-    processing(path_input, path_preprocessing)
-    blocks = []
-    variables = {}
-    clauses = []
-    with open(path_preprocessing, "r") as file:
-        for line in file:
-            split = line.strip().split(" ")
-            if split[0] == 'c' or split[0] == 'p' or split[0] == '0':
-                continue
-            elif split[0] == 'e' or split[0] == 'a':
-                blocks.append(split[0])
-                del split[-1]
-                del split[0]
-                for item in split:
-                    variables["x_" + item] = len(blocks)
-            else:
-                del split[-1]
-                clause = set(map(int, split))
-                clauses.append(clause)
-    return blocks, variables, clauses
-
-
-def get_bipartite_graph(clauses):  # Build the bipartite graph of a given formula.
-    bipartite_graph = nx.Graph()
-    for clause in clauses:
-        for literal in clause:
-            bipartite_graph.add_edge("c_" + str(clauses.index(clause) + 1), "x_" + str(abs(literal)))
-    return bipartite_graph
-
-
-def write_graph_to_file(path, graph):  # Method that saves a given graph in a .gr file.
-    nodes = list(graph.nodes)
-    edges = list(graph.edges)
-    with open(path, "w") as file:
-        file.write("p tw " + str(len(nodes)) + " " + str(len(edges)) + "\n")
-        for edge in edges:
-            file.write(str(nodes.index(edge[0]) + 1) + " " + str(nodes.index(edge[1]) + 1) + "\n")
-    variable_dictionary = {}
-    for node in nodes:
-        variable_dictionary[nodes.index(node) + 1] = str(node)
-    return variable_dictionary
-
-
-def get_flowcutter_tree_decomposition(basename, graph):
-    # Method that computes a tree decomposition of a given graph using flowcutter.
-
-    # Save the graph as .gr file and use flowcutter to compute a tree decomposition saved in a .gr file.
-    path_graph = GRAPH_DIRECTORY_NAME + "/" + basename + ".gr"
-    path_td = TREE_DECOMPOSITION_DIRECTORY_NAME + "/" + basename + "_td.gr"
-    variable_dictionary = write_graph_to_file(path_graph, graph)
-    os.system("sh " + FLOWCUTTER_SCRIPT_NAME + " " + path_graph + " " + path_td + " " + str(FLOWCUTTER_TIME))
-
-    # Read the calculated tree decomposition from file.
-    bags = []
-    edges = []
-    with open(path_td, "r") as file:
-        for line in file:
-            split = line.strip().split(" ")
-            if split[0] == 'c' or split[0] == 's':
-                continue
-            elif split[0] == 'b':
-                del split[0]
-                del split[0]
-                bag = set()
-                for item in split:
-                    bag.add(variable_dictionary[int(item)])
-                bags.append(bag)
-            else:
-                edges.append((int(split[0]) - 1, int(split[1]) - 1))
-    return bags, edges
-
-
-def special_solving(bags, edges, clauses):
-    # Method for the new special solution approach, which computes an new equivalent formula for a given one.
-
-    # Transfer the given tree decomposition into a own data structure using the class Node.
-    nodes = []
-    for i in range(len(bags)):
-        nodes.append(Node(i + 1, bags[i], clauses))
-    edges = list(edges)
-    queue = [0]
-    while queue:
-        index = queue.pop()
-        for edge in list(edges):
-            i = -1
-            if edge[1] == index:
-                i = 0
-            elif edge[0] == index:
-                i = 1
-            if i > -1:
-                nodes[index].children.append(nodes[edge[i]])
-                nodes[edge[i]].parent = nodes[index]
-                queue.append(edge[i])
-                edges.remove(edge)
-    root = nodes[0]
-
-    # Normalize the tree decomposition so that each node has only 2 children at most.
-    queue = [root]
-    while queue:
-        node = queue.pop()
-        size = len(node.children)
-        if size == 3:
-            clone = Node(len(nodes) + 1, node.bag(), clauses, node)
-            nodes.append(clone)
-            clone.children.append(node.children[0])
-            node.children[0].parent = clone
-            clone.children.append(node.children[1])
-            node.children[1].parent = clone
-            node.children = [clone, node.children[2]]
-        elif size > 3:
-            clone1 = Node(len(nodes) + 1, node.bag(), clauses, node)
-            nodes.append(clone1)
-            clone2 = Node(len(nodes) + 1, node.bag(), clauses, node)
-            nodes.append(clone2)
-            for child in node.children[:size // 2]:
-                clone1.children.append(child)
-                child.parent = clone1
-            for child in node.children[size // 2:]:
-                clone2.children.append(child)
-                child.parent = clone2
-            node.children = [clone1, clone2]
-        queue.extend(node.children)
-
-    # Using the transform method of the root to calculate the new formula and convert it into cnf.
-    return root.transform(clauses).to_cnf()
-
-
-def unit_propagation(formula, protected_variables):  # Unit propagation can lead to an improvement of the result
-    litmap, _, clauses = formula.encode_cnf()
-    unit_clauses = []
-    for clause in clauses:
-        clause = list(clause)
-        variable = litmap[abs(clause[0])]
-        if len(clause) == 1 and str(variable) not in protected_variables:
-            unit_clauses.append(clause)
-    if len(unit_clauses) == 0:
-        return formula
-    else:
-        for clause in unit_clauses:
-            variable = litmap[abs(clause[0])]
-            if clause[0] > 0:
-                formula = formula.restrict({variable: 1})
-            else:
-                formula = formula.restrict({variable: 0})
-        return unit_propagation(formula, protected_variables)
-
-
-def write_output(basename, extension, blocks, variables, formula):
-    # Method to write a given new formula in a qdimacs format file.
-
-    path_postprocessing = POSTPROCESSING_DIRECTORY_NAME + "/" + basename + "_postprocessed.qdimacs"
-    path_output = OUTPUT_DIRECTORY_NAME + "/" + basename + "_" + extension + ".qdimacs"
-    litmap, degree, clauses = formula.encode_cnf()
-    with open(path_postprocessing, "w") as file:
-        file.write("p cnf " + str(degree) + " " + str(len(clauses)) + "\n")
-        new_blocks = []
-        for _ in range(len(blocks)):
-            new_blocks.append(set())
-        for clause in clauses:
-            for literal in clause:
-                variable = str(litmap[abs(literal)])
-                block = len(blocks)
-                if variable in variables.keys():
-                    block = variables[variable]
-                new_blocks[block - 1].add(litmap[eda.exprvar(variable)])
-        for block in new_blocks:
-            line = str(blocks[new_blocks.index(block)]) + " "
-            for variable in block:
-                line += str(variable) + " "
-            file.write(line + "0\n")
-        for clause in clauses:
-            line = ""
-            for literal in clause:
-                line += str(literal) + " "
-            file.write(line + "0\n")
-
-    # Preprocessing the input file to achieve an improvement of the result.
-    processing(path_postprocessing, path_output)
+# flowcutter is stopped earlier if the width did not improve for FLOWCUTTER_PLATEAU_TIME seconds or if a bag size of
+# at most FLOWCUTTER_TARGET_WIDTH is reached. None disables a rule.
+FLOWCUTTER_PLATEAU_TIME = 5
+FLOWCUTTER_TARGET_WIDTH = None
+
+# If FLOWCUTTER_TIME_PER_NODE is set, flowcutter gets FLOWCUTTER_MINIMUM_TIME plus FLOWCUTTER_TIME_PER_NODE seconds per
+# node of the graph (but never more than FLOWCUTTER_TIME), so small graphs do not wait for the whole time.
+FLOWCUTTER_TIME_PER_NODE = None
+FLOWCUTTER_MINIMUM_TIME = 1
+
+# The tree decomposition and its root are chosen by a portfolio (see qbf/portfolio.py): the tree decompositions that
+# flowcutter printed and the tree decompositions of the elimination ordering heuristics PORTFOLIO_HEURISTICS are
+# counted with every root strategy of PORTFOLIO_ROOT_STRATEGIES (see decomposition.ROOT_STRATEGIES) in
+# PORTFOLIO_PROCESSES processes. The pair with the smallest new formula for PORTFOLIO_OBJECTIVE (see
+# portfolio.OBJECTIVES) is transformed. flowcutter_pace17 prints only its best decomposition (when it gets SIGTERM),
+# so it gives one candidate; solvers that print every improvement give one candidate per improvement. Without
+# heuristics and with one root strategy the tree decomposition of flowcutter is used as it is.
+PORTFOLIO_HEURISTICS = elimination.HEURISTICS
+PORTFOLIO_ROOT_STRATEGIES = decomposition.ROOT_STRATEGIES
+PORTFOLIO_OBJECTIVE = portfolio.WIDTH
+PORTFOLIO_PROCESSES = 1
+
+# After the unit propagation the c-variables of the new formula are removed by bounded variable elimination if
+# VARIABLE_ELIMINATION is True (see qbf/simplification.py). No resolvent may be longer than ELIMINATION_MAX_LENGTH
+# literals, None means the longest clause before the elimination. The new formula is processed by QRATPre+ before it
+# is saved if QRATPRE_POSTPROCESSING is True, otherwise it is written directly into the output file.
+VARIABLE_ELIMINATION = True
+ELIMINATION_MAX_LENGTH = None
+QRATPRE_POSTPROCESSING = True
+
+
+def get_config():  # Method that returns the settings that the new formulas depend on.
+    return {"test": "dynQBF comparison part A", "qratpre": cache.tool_digest(QRATPRE_PATH),
+            "flowcutter": cache.tool_digest(FLOWCUTTER_PATH), "flowcutter_time": FLOWCUTTER_TIME,
+            "flowcutter_plateau_time": FLOWCUTTER_PLATEAU_TIME, "flowcutter_target_width": FLOWCUTTER_TARGET_WIDTH,
+            "flowcutter_time_per_node": FLOWCUTTER_TIME_PER_NODE, "flowcutter_minimum_time": FLOWCUTTER_MINIMUM_TIME,
+            "portfolio_heuristics": PORTFOLIO_HEURISTICS, "portfolio_root_strategies": PORTFOLIO_ROOT_STRATEGIES,
+            "portfolio_objective": PORTFOLIO_OBJECTIVE, "variable_elimination": VARIABLE_ELIMINATION,
+            "elimination_max_length": ELIMINATION_MAX_LENGTH, "qratpre_postprocessing": QRATPRE_POSTPROCESSING}
+
+
+def get_output_path(basename, extension):  # Method that returns the path of a new formula.
+    return OUTPUT_DIRECTORY_NAME + "/" + basename + "_" + extension + ".qdimacs"
+
+
+def write_output(directory, basename, extension, blocks, levels, formula):
+    # Method to write a given new formula in a qdimacs format file. It returns the number of variables of the
+    # written formula (before QRATPre+), see pipeline.write_formula.
+    path_postprocessing = directory + "/" + basename + "_postprocessed.qdimacs"
+    path_output = get_output_path(basename, extension)
+    if not QRATPRE_POSTPROCESSING:
+        return pipeline.write_formula(path_output, blocks, levels, formula)
+    number_of_variables = pipeline.write_formula(path_postprocessing, blocks, levels, formula)
+
+    # Processing the new formula with QRATPre+ can lead to an improvement of the result. Its output goes directly
+    # into the output file.
+    tools.qratpre(QRATPRE_PATH, path_postprocessing, output=path_output, timeout=QRATPRE_TIMEOUT)
+    return number_of_variables
+
+
+def process_file(directory, basename):
+    # Method that computes the new formula of one input file. Intermediate files are saved in directory. It returns
+    # the result record of the file.
+    print("start " + basename + ".")
+
+    # Read the qdimacs input file.
+    stages = instrumentation.Stages(basename, TRACE_MEMORY, PROFILE_STAGE, PROFILE_DIRECTORY_NAME)
+    artifact_cache = cache.Cache(CACHE_DIRECTORY_NAME, CACHE_SIZE)
+    with stages.stage("preprocessing"):
+        blocks, levels, clauses, key = pipeline.preprocess(INPUT_DIRECTORY_NAME + "/" + basename + ".qdimacs",
+                                                           directory, artifact_cache, QRATPRE_PATH, QRATPRE_TIMEOUT,
+                                                           KEEP_ARTIFACTS)
+    print("read formula of " + basename + ".")
+
+    # Get the candidate tree decompositions of the bipartite graph by using flowcutter and the elimination ordering
+    # heuristics. The flowcutter candidates are numbered in the order of decreasing width, the last one is the best
+    # (usually there is only "flowcutter 0", see above).
+    candidates = []
+    decompositions = pipeline.flowcutter_decompositions(directory, clauses, artifact_cache, key, FLOWCUTTER_PATH,
+                                                        FLOWCUTTER_TIME, FLOWCUTTER_PLATEAU_TIME,
+                                                        FLOWCUTTER_TARGET_WIDTH, stages, FLOWCUTTER_TIME_PER_NODE,
+                                                        FLOWCUTTER_MINIMUM_TIME)
+    for i in range(len(decompositions)):
+        bags, edges = decompositions[i]
+        candidates.append(portfolio.Candidate("flowcutter " + str(i), bags, edges))
+    if PORTFOLIO_HEURISTICS:
+        with stages.stage("heuristics"):
+            graph = graphs.get_incidence_graph(clauses)
+            heuristic_decompositions = pipeline.heuristic_decompositions(graph, PORTFOLIO_HEURISTICS)
+        for heuristic, (bags, edges, _) in zip(PORTFOLIO_HEURISTICS, heuristic_decompositions):
+            candidates.append(portfolio.Candidate(heuristic, bags, edges))
+
+    # Choose the tree decomposition and the root with the smallest new formula and compute the new formula.
+    with stages.stage("portfolio"):
+        candidate, best, scores = portfolio.select(candidates, clauses, PORTFOLIO_ROOT_STRATEGIES,
+                                                   PORTFOLIO_OBJECTIVE, PORTFOLIO_PROCESSES)
+    print("chose " + candidate.source + " out of " + str(len(candidates)) + " tree decompositions for " + basename
+          + " (" + str(best) + ").")
+    formula, statistics = pipeline.special_solving(candidate.bags, candidate.edges, clauses, best.root_strategy,
+                                                   stages, len(levels) - 1)
+    print("computed formula of " + basename + " (" + str(statistics) + ").")
+
+    # Using unit propagation to achieve an improvement.
+    with stages.stage("unit propagation"):
+        formula = pipeline.unit_propagation(formula, pipeline.get_protected_variables(blocks, levels))
+    print("computed unit propagation of " + basename + ".")
+    clauses_after_unit_propagation = len(formula.clauses)
+
+    # Eliminating c-variables makes the new formula smaller.
+    eliminated = 0
+    if VARIABLE_ELIMINATION:
+        with stages.stage("variable elimination"):
+            formula, eliminated = pipeline.variable_elimination(formula, ELIMINATION_MAX_LENGTH)
+        print("eliminated " + str(eliminated) + " variables and " + str(clauses_after_unit_propagation
+                                                                          - len(formula.clauses)) + " clauses of "
+              + basename + ".")
+
+    # Save the computed formula in a qdimacs file.
+    with stages.stage("output"):
+        number_of_variables = write_output(directory, basename, "new", blocks, levels, formula)
+    print("stages of " + basename + ": " + str(stages) + ".")
+    record = statistics.to_dict()
+    record["source"] = candidate.source
+    record["portfolio"] = scores
+    record["variables"] = number_of_variables
+    record["clauses_after_unit_propagation"] = clauses_after_unit_propagation
+    record["eliminated_variables"] = eliminated
+    record["clauses_after_variable_elimination"] = len(formula.clauses)
+    record["stages"] = stages.to_dict()
+    return record
 
 
 def main():
+    basenames = []
     for _, _, files in os.walk("./" + INPUT_DIRECTORY_NAME):  # Calculate results for each file in the input directory.
         for filename in files:
             split = filename.split(".")
             del split[-1]
-            basename = ".".join(split)
-            print("start " + filename + ".")
-
-            # Read the qdimacs input file and build the bipartite graph.
-            blocks, variables, clauses = read_qdimacs_file(basename)
-            graph = get_bipartite_graph(clauses)
-            print("computed bipartite graph.")
-
-            # Get a tree decomposition by using flowcutter and compute a new formula.
-            bags, edges = get_flowcutter_tree_decomposition(basename, graph)
-            formula = special_solving(bags, edges, clauses)
-            print("computed formula.")
-
-            # Using unit propagation to achieve an improvement.
-            protected_variables = set()
-            for variable in variables.keys():
-                if blocks[variables[variable] - 1] == 'a':
-                    protected_variables.add(variable)
-            formula = unit_propagation(formula, protected_variables)
-            print("computed unit propagation.")
-
-            # Save the computed formula in a qdimacs file.
-            write_output(basename, "new", blocks, variables, formula)
-            print(filename + " done.")
-
-
-main()
+            basenames.append(".".join(split))
+    basenames.sort()
+
+    # Only the files without a result for the current configuration are handled.
+    store = results.Store(RESULTS_DATABASE_NAME)
+    config = get_config()
+    config_key = results.get_config_key(config)
+    instance_keys = {}
+    instances = []
+    for basename in basenames:
+        instance_keys[basename] = cache.file_digest(INPUT_DIRECTORY_NAME + "/" + basename + ".qdimacs")
+        if store.done(instance_keys[basename], config_key) and os.path.isfile(get_output_path(basename, "new")):
+            print(basename + ".qdimacs already done.")
+        else:
+            instances.append((basename,))
+
+    # The files are handled in parallel, each result is saved as soon as the file is done.
+    def save(index, result):
+        basename = instances[index][0]
+        store.put(basename, instance_keys[basename], config, result.status, result.message, result.time,
+                  result.value)
+        print(basename + ".qdimacs " + result.status + ". " + result.message)
+
+    batch.run(process_file, instances, PROCESSES, INSTANCE_TIMEOUT, INSTANCE_MEMORY_LIMIT, WORK_DIRECTORY_NAME,
+              KEEP_ARTIFACTS, save)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
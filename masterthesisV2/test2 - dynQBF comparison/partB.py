@@ -1,16 +1,55 @@
 import os  # This package provides access to the operating system.
-import time  # This package provides access to the system time.
+import sys  # This package provides access to the module search path.
 
-# Change the names here to use other directories or to change the name of the used bash scripts.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from qbf import benchmark  # This package measures the run times of dynQBF.
+from qbf import cache  # This package provides the digests of files.
+from qbf import results  # This package provides the results database.
+from qbf import tools  # This package runs dynQBF with a pipe.
+
+# Change the names here to use other directories.
 INPUT_DIRECTORY_NAME = "input"
 NEW_INPUT_DIRECTORY_NAME = "input_new"
+
+# The output of dynQBF (with the decomposition) is read from a pipe. It is only saved in DYNQBF_RESULT_DIRECTORY_NAME
+# if KEEP_ARTIFACTS is True.
 DYNQBF_RESULT_DIRECTORY_NAME = "dynQBF_results"
-RUNTIME_MEASUREMENT_SCRIPT_NAME = "runtime_measurement.sh"
-DYNQBF_SCRIPT_NAME = "dynqbf.sh"
+KEEP_ARTIFACTS = False
 
 RESULT_FILENAME = "result.txt"  # Change here to rename the result file.
 
-N = 10  # Change here to change the iterations of the runtime measurement
+# Every measured input file is saved at once in the database RESULTS_DATABASE_NAME, keyed by the content of the
+# original and the new formula and the configuration. A restarted run skips the files that are already done,
+# result.txt is written from the database at the end. Query it with "python3 -m qbf.results" in masterthesisV2.
+RESULTS_DATABASE_NAME = "results_partB.sqlite"
+
+DYNQBF_PATH = "../tools/dynqbf-v1.1.1/dynqbf-v1.1.1_x86-64_static"  # Path of the dynQBF executable.
+
+# dynQBF runs WARMUPS times without being measured (the first of them prints the decomposition for get_info). Then
+# it runs at least MIN_RUNS and at most MAX_RUNS times until the CONFIDENCE interval of the mean time (MEASURE "cpu"
+# or "wall") is at most CI_TARGET of the mean on each side, or MAX_MEASUREMENT_TIME seconds are over. A run is
+# stopped after RUN_TIMEOUT seconds. None disables a limit.
+WARMUPS = 2
+MIN_RUNS = 5
+MAX_RUNS = 50
+CONFIDENCE = 0.95
+CI_TARGET = 0.02
+MEASURE = "cpu"
+MAX_MEASUREMENT_TIME = 600
+RUN_TIMEOUT = 3600
+
+# List of cpu numbers the measurements run on in parallel, each measurement pinned to one of them. None runs the
+# measurements one after another without pinning.
+BENCHMARK_CORES = None
+
+
+def read_dynqbf_result(file):  # Method that reads the width and the result from the output of dynQBF.
+    file.readline()
+    width = int(file.readline().strip().split(b" ")[1])
+    line = b""
+    for line in file:
+        pass
+    return width, line.strip().split(b" ")[1].decode()
 
 
 def get_info(path, name):
@@ -21,61 +60,145 @@ def get_info(path, name):
             if split[0] == 'p':
                 result[0] = int(split[2])
                 result[1] = int(split[3])
-    path_dynqbf_result = DYNQBF_RESULT_DIRECTORY_NAME + "/" + name
-    os.system("sh " + DYNQBF_SCRIPT_NAME + " " + path + " " + path_dynqbf_result)
-    with open(path_dynqbf_result) as file:
-        file.readline()
-        result[2] = int(file.readline().strip().split(" ")[1])
-        line = ""
-        for line in file:
-            pass
-        result[3] = line.strip().split(" ")[1]
+    path_dynqbf_result = None
+    if KEEP_ARTIFACTS:
+        path_dynqbf_result = DYNQBF_RESULT_DIRECTORY_NAME + "/" + name
+    result[2], result[3] = tools.run([DYNQBF_PATH, "-f", path, "--print-decomposition"], read_dynqbf_result,
+                                     path_dynqbf_result, RUN_TIMEOUT)
     return result
 
 
-def runtime_measurement(path):
-    time_start = time.time()
-    os.system("sh " + RUNTIME_MEASUREMENT_SCRIPT_NAME + " " + path + " " + str(N))
-    time_end = time.time()
-    return (time_end - time_start)/N
+def runtime_measurement(path, name):
+    # Method that gets the info of a formula and measures the run time of dynQBF on it. The run of get_info is the
+    # first warmup. It returns the status ("ok", "timeout" or "error"), the message, the info and the measurement, so
+    # a failed run of dynQBF only aborts its own file.
+    try:
+        info = get_info(path, name)
+    except tools.ToolError as error:
+        return "timeout" if error.timed_out else "error", str(error), None, None
+    measurement = benchmark.measure([DYNQBF_PATH, "-f", path], max(WARMUPS - 1, 0), MIN_RUNS, MAX_RUNS, CI_TARGET,
+                                    CONFIDENCE, MEASURE, RUN_TIMEOUT, MAX_MEASUREMENT_TIME)
+    return "ok", "", info, measurement
 
 
-def write_result(basename, info1, info2, runtime1, runtime2):
+def get_config():  # Method that returns the settings that the measurements depend on.
+    return {"test": "dynQBF comparison part B", "dynqbf": cache.tool_digest(DYNQBF_PATH), "warmups": WARMUPS,
+            "min_runs": MIN_RUNS, "max_runs": MAX_RUNS, "confidence": CONFIDENCE, "ci_target": CI_TARGET,
+            "measure": MEASURE, "max_measurement_time": MAX_MEASUREMENT_TIME, "run_timeout": RUN_TIMEOUT,
+            "benchmark_cores": BENCHMARK_CORES}
+
+
+def get_record(info, measurement):  # Method that returns the result record of one formula.
+    return {"variables": info[0], "clauses": info[1], "width": info[2], "result": info[3],
+            "runtime": measurement.to_dict()}
+
+
+def format_runtime(runtime):  # Method that describes the measured times of a runtime record in one line.
+    summary = runtime[runtime["metric"]]
+    if summary["runs"] == 0:
+        return "no runs (timeout)"
+    line = (str(summary["mean"]) + " s (" + runtime["metric"] + " time, " + str(summary["runs"]) + " runs, median "
+            + str(summary["median"]))
+    if summary["stddev"] is not None:
+        line += " s, stddev " + str(summary["stddev"]) + " s, " + str(round(100 * runtime["confidence"])) + "% CI ["
+        line += str(summary["ci_low"]) + ", " + str(summary["ci_high"]) + "]"
+    return line + " s)"
+
+
+def write_result(basename, record):
+    original = record["original"]
+    new = record["new"]
     with open(RESULT_FILENAME, "a") as file:
         file.write("RESULTS OF " + basename + ":\n")
-        file.write("number of variables: " + str(info1[0]) + " - " + str(info2[0]) + "\n")
-        file.write("number of clauses: " + str(info1[1]) + " - " + str(info2[1]) + "\n")
-        file.write("dynQBF width: " + str(info1[2]) + " - " + str(info2[2]) + "\n")
-        file.write("dynQBF result: " + info1[3] + " - " + info2[3] + "\n")
-        file.write("avg. runtime original: " + str(runtime1) + " s\n")
-        file.write("avg. runtime new: " + str(runtime2) + " s\n")
+        file.write("number of variables: " + str(original["variables"]) + " - " + str(new["variables"]) + "\n")
+        file.write("number of clauses: " + str(original["clauses"]) + " - " + str(new["clauses"]) + "\n")
+        file.write("dynQBF width: " + str(original["width"]) + " - " + str(new["width"]) + "\n")
+        file.write("dynQBF result: " + original["result"] + " - " + new["result"] + "\n")
+        file.write("avg. runtime original: " + format_runtime(original["runtime"]) + "\n")
+        file.write("avg. runtime new: " + format_runtime(new["runtime"]) + "\n")
         file.write("\n")
 
 
-def main():
-    file = open(RESULT_FILENAME, "w")  # Clear the result file.
-    file.close()
+def write_error(basename, status, message):  # Save an aborted file in the result file.
+    with open(RESULT_FILENAME, "a") as file:
+        file.write("RESULTS OF " + basename + ":\n")
+        file.write("aborted (" + status + "): " + message.strip().split("\n")[-1] + "\n")
+        file.write("\n")
+
 
+def main():
+    basenames = []
     for _, _, files in os.walk("./" + INPUT_DIRECTORY_NAME):
         for filename in files:
             split = filename.split(".")
             del split[-1]
-            basename = ".".join(split)
-            basename_new = basename + "_new"
-            path1 = INPUT_DIRECTORY_NAME + "/" + basename + ".qdimacs"
-            path2 = NEW_INPUT_DIRECTORY_NAME + "/" + basename_new + ".qdimacs"
-            print("start " + filename + ".")
-
-            info1 = get_info(path1, basename)
-            info2 = get_info(path2, basename_new)
-            print("got info.")
-
-            runtime1 = runtime_measurement(path1)
-            runtime2 = runtime_measurement(path2)
-            print("got avg. runtimes.")
-
-            write_result(basename, info1, info2, runtime1, runtime2)
-            print(filename + " done.")
-
-
-main()
+            basenames.append(".".join(split))
+    basenames.sort()
+
+    # Only the files without a result for the current configuration are measured.
+    store = results.Store(RESULTS_DATABASE_NAME)
+    config = get_config()
+    config_key = results.get_config_key(config)
+    instance_keys = {}
+    pending = []
+    for basename in basenames:
+        path1 = INPUT_DIRECTORY_NAME + "/" + basename + ".qdimacs"
+        path2 = NEW_INPUT_DIRECTORY_NAME + "/" + basename + "_new.qdimacs"
+        if not os.path.isfile(path2):
+            # Part A failed on this file. It is saved as an error under the key of the original formula alone, so a
+            # new formula written later gets measured by the next run.
+            instance_keys[basename] = cache.get_key(cache.file_digest(path1))
+            store.put(basename, instance_keys[basename], config, "error", "new formula missing")
+            print(basename + ".qdimacs error (new formula missing).")
+            continue
+        instance_keys[basename] = cache.get_key(cache.file_digest(path1), cache.file_digest(path2))
+        if store.done(instance_keys[basename], config_key):
+            print(basename + ".qdimacs already done.")
+        else:
+            pending.append(basename)
+
+    # Every formula is one job, the original and the new formula of each file are measured under the same conditions.
+    # A file is saved as soon as both of its jobs are done.
+    jobs = []
+    for basename in pending:
+        basename_new = basename + "_new"
+        jobs.append((INPUT_DIRECTORY_NAME + "/" + basename + ".qdimacs", basename))
+        jobs.append((NEW_INPUT_DIRECTORY_NAME + "/" + basename_new + ".qdimacs", basename_new))
+
+    originals = {}
+
+    def save(index, result):
+        if index % 2 == 0:
+            originals[index // 2] = result
+            return
+        basename = pending[index // 2]
+        original = originals.pop(index // 2)
+        for formula, (status, message, _, _) in (("original", original), ("new", result)):
+            if status != "ok":  # The file is saved with the status of the first failed formula.
+                store.put(basename, instance_keys[basename], config, status, formula + " formula: " + message)
+                print(basename + ".qdimacs " + status + ".")
+                return
+        record = {"original": get_record(*original[2:]), "new": get_record(*result[2:])}
+        store.put(basename, instance_keys[basename], config, "ok", record=record)
+        print(basename + ".qdimacs done.")
+
+    print("start measurements of " + str(len(pending)) + " files.")
+    benchmark.run_jobs(runtime_measurement, jobs, BENCHMARK_CORES, save)
+
+    # Write the result file in the order of basenames.
+    file = open(RESULT_FILENAME, "w")  # Clear the result file.
+    file.close()
+    for basename in basenames:
+        row = store.get(instance_keys[basename], config_key)
+        if row is None:
+            continue
+        status, message, _, record = row
+        if status == "ok":
+            write_result(basename, record)
+        else:
+            write_error(basename, status, message)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+#!/bin/bash
+
+# Script that runs scaling.py
+
+echo "start scaling.py."
+python3 scaling.py "$@"
+echo "end scaling.py."
@@ -0,0 +1,219 @@
+import argparse  # This package provides the command line options.
+import gc  # This package provides the garbage collection between the runs.
+import json  # This package provides the baseline file format.
+import math  # This package provides the logarithm of the scaling exponent.
+import os  # This package provides access to the operating system.
+import platform  # This package describes the machine of a baseline.
+import sys  # This package provides access to the module search path.
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from qbf import decomposition  # This package provides the tree decomposition data structure.
+from qbf import elimination  # This package provides the elimination ordering heuristics.
+from qbf import generator  # This package generates the synthetic instances.
+from qbf import graphs  # This package provides the incidence graph.
+from qbf import instrumentation  # This package measures the stages of the instances.
+from qbf import pipeline  # This package provides the steps of the transformation.
+from qbf import propagation  # This package provides the unit propagation.
+
+RESULT_FILENAME = "result.txt"  # Change here to rename the result file.
+
+# The times of the last run are saved in BASELINE_FILENAME if there is no baseline yet or if the option
+# --save-baseline is given. Baselines depend on the machine, so every machine should save its own one.
+BASELINE_FILENAME = "baseline.json"
+
+# A stage of an instance is a regression if its time is more than REGRESSION_THRESHOLD (relative) and more than
+# MIN_REGRESSION_TIME seconds (absolute, to ignore the noise of very short stages) above the baseline. The baseline
+# times are scaled by the speed of the machine, which is the time of the whole transformation of the smallest
+# instance of the first family before and after the suite (the better one) compared to the baseline. The script
+# exits with code 1 if there is a regression.
+REGRESSION_THRESHOLD = 0.25
+MIN_REGRESSION_TIME = 0.02
+
+# Every instance is run REPEATS times and the smallest time of every stage is used.
+REPEATS = 3
+
+# The families of the suite. Every family is generated for each number of variables in sizes with ratio clauses per
+# variable, k variables per clause and the treewidth bound width (see qbf/generator.py). The random family has no
+# bounded treewidth, so its sizes are smaller.
+SUITE = [
+    {"family": generator.PATH, "ratio": 3, "k": 3, "width": 8, "sizes": [2000, 4000, 8000, 16000]},
+    {"family": generator.GRID, "ratio": 3, "k": 3, "width": 6, "sizes": [2000, 4000, 8000, 16000]},
+    {"family": generator.TREE, "ratio": 3, "k": 3, "width": 6, "sizes": [2000, 4000, 8000, 16000]},
+    {"family": generator.RANDOM, "ratio": 1, "k": 3, "width": 0, "sizes": [100, 200, 300, 400]},
+]
+PREFIX = "eae"  # Quantifier prefix of all instances.
+SEED = 0
+
+# The tree decompositions are computed with this elimination ordering heuristic, so no external tool is needed. The
+# root of the tree decomposition is chosen by ROOT_STRATEGY.
+ELIMINATION_HEURISTIC = elimination.MIN_FILL
+ROOT_STRATEGY = decomposition.ROOT_COST
+
+STAGES = ["generation", "graph", "decomposition", "nodes", "encoding", "unit propagation"]
+
+
+def get_name(case, size):  # Method that returns the name of an instance of the suite.
+    return case["family"] + "_" + str(size)
+
+
+def run_instance(case, size):
+    # Method that runs the whole transformation of one instance once. It returns the instrumentation.Stages of the
+    # run and the sizes of the tree decomposition and the new formula.
+    stages = instrumentation.Stages(get_name(case, size))
+    with stages.stage("generation"):
+        blocks, levels, clauses = generator.generate(case["family"], size, case["ratio"] * size, case["k"],
+                                                     case["width"], PREFIX, SEED)
+    with stages.stage("graph"):
+        graph = graphs.get_incidence_graph(clauses)
+    with stages.stage("decomposition"):
+        bags, edges, width = pipeline.heuristic_decomposition(graph, [ELIMINATION_HEURISTIC])
+    formula, statistics = pipeline.special_solving(bags, edges, clauses, ROOT_STRATEGY, stages, len(levels) - 1)
+    with stages.stage("unit propagation"):
+        protected_variables = pipeline.get_protected_variables(blocks, levels)
+        simplified, _, _ = propagation.unit_propagation(formula.clauses, formula.number_of_variables(),
+                                                        protected_variables)
+    sizes = {"width": width, "clones": statistics.clones, "variables": formula.number_of_variables(),
+             "clauses": len(formula.clauses), "clauses_after_unit_propagation": len(simplified)}
+    return stages, sizes
+
+
+def measure_instance(case, size):
+    # Method that runs an instance REPEATS times and returns the smallest wall and cpu time of every stage and the
+    # sizes of the last run.
+    times = {}
+    sizes = None
+    for _ in range(REPEATS):
+        gc.collect()
+        stages, sizes = run_instance(case, size)
+        for stage, record in stages.to_dict().items():
+            best = times.setdefault(stage, {"wall": math.inf, "cpu": math.inf})
+            best["wall"] = min(best["wall"], record["wall"])
+            best["cpu"] = min(best["cpu"], record["cpu"])
+    return {"times": times, "sizes": sizes}
+
+
+def get_reference():
+    # Method that returns the best total time of the transformation of the smallest instance of the first family.
+    # The first call also warms up the process.
+    case = SUITE[0]
+    measurement = measure_instance(case, case["sizes"][0])
+    return sum(times["wall"] for times in measurement["times"].values())
+
+
+def scaling_exponent(sizes, times):
+    # Method that returns the slope of the least squares line through the points (log size, log time), for example
+    # about 1 for a linear and about 2 for a quadratic stage. None if there are less than two usable points.
+    points = [(math.log(size), math.log(time)) for size, time in zip(sizes, times) if time > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def compare(measurements, reference, baseline):
+    # Method that returns the regressions (name, stage, time, scaled baseline time) and the instances whose sizes
+    # differ from the baseline (which means that the transformation itself changed).
+    speed = reference / baseline["reference"]
+    regressions = []
+    changed = []
+    for name, measurement in measurements.items():
+        old = baseline["instances"].get(name)
+        if old is None:
+            continue
+        if old["sizes"] != measurement["sizes"]:
+            changed.append(name)
+        for stage, times in measurement["times"].items():
+            if stage not in old["times"]:
+                continue
+            time = times["wall"]
+            old_time = old["times"][stage]["wall"] * speed
+            if time > old_time * (1 + REGRESSION_THRESHOLD) and time - old_time > MIN_REGRESSION_TIME:
+                regressions.append((name, stage, time, old_time))
+    return regressions, changed
+
+
+def get_machine():  # Method that describes the machine and the python version of a run.
+    return {"machine": platform.machine(), "processor": platform.processor(), "system": platform.system(),
+            "python": platform.python_version(), "cpus": os.cpu_count()}
+
+
+def write_result(measurements, reference, baseline, regressions, changed):
+    with open(RESULT_FILENAME, "w") as file:
+        file.write("Wall time in seconds of every stage (best of " + str(REPEATS) + " runs), baseline in brackets (not"
+                   + " scaled).\n\n")
+        for case in SUITE:
+            for size in case["sizes"]:
+                name = get_name(case, size)
+                measurement = measurements[name]
+                old = None if baseline is None else baseline["instances"].get(name)
+                file.write(name + ": " + ", ".join(key + " " + str(value)
+                                                   for key, value in measurement["sizes"].items()) + "\n")
+                for stage in STAGES:
+                    line = "    " + stage + ": " + format(measurement["times"][stage]["wall"], ".4f")
+                    if old is not None and stage in old["times"]:
+                        line += " (" + format(old["times"][stage]["wall"], ".4f") + ")"
+                    file.write(line + "\n")
+            file.write("scaling exponents of " + case["family"] + ": ")
+            exponents = []
+            for stage in STAGES:
+                exponent = scaling_exponent(case["sizes"], [measurements[get_name(case, size)]["times"][stage]["wall"]
+                                                            for size in case["sizes"]])
+                exponents.append(stage + " " + ("-" if exponent is None else format(exponent, ".2f")))
+            file.write(", ".join(exponents) + "\n\n")
+        if baseline is None:
+            file.write("No baseline.\n")
+            return
+        if baseline["machine"] != get_machine():
+            file.write("The baseline was saved on another machine: " + json.dumps(baseline["machine"]) + "\n")
+        file.write("Reference time " + format(reference, ".4f") + " s, baseline " + format(baseline["reference"], ".4f")
+                   + " s.\n")
+        for name in changed:
+            file.write("The sizes of " + name + " differ from the baseline.\n")
+        for name, stage, time, old_time in regressions:
+            file.write("Regression of " + name + " in " + stage + ": " + format(time, ".4f") + " s instead of "
+                       + format(old_time, ".4f") + " s.\n")
+        if not regressions:
+            file.write("No regressions.\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the transformation on synthetic instances.")
+    parser.add_argument("--save-baseline", action="store_true", help="save the times of this run as baseline")
+    options = parser.parse_args()
+
+    reference = get_reference()
+    measurements = {}
+    for case in SUITE:
+        for size in case["sizes"]:
+            name = get_name(case, size)
+            measurements[name] = measure_instance(case, size)
+            print("measured " + name + ".")
+    reference = min(reference, get_reference())
+
+    baseline = None
+    if os.path.isfile(BASELINE_FILENAME):
+        with open(BASELINE_FILENAME) as file:
+            baseline = json.load(file)
+    regressions = []
+    changed = []
+    if baseline is not None:
+        regressions, changed = compare(measurements, reference, baseline)
+    write_result(measurements, reference, baseline, regressions, changed)
+    if baseline is None or options.save_baseline:
+        with open(BASELINE_FILENAME, "w") as file:
+            json.dump({"machine": get_machine(), "repeats": REPEATS, "reference": reference,
+                       "instances": measurements}, file, indent=2)
+        print("saved baseline.")
+    for name, stage, time, old_time in regressions:
+        print("regression of " + name + " in " + stage + ": " + format(time, ".4f") + " s instead of "
+              + format(old_time, ".4f") + " s.")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
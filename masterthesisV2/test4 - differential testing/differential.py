@@ -0,0 +1,183 @@
+import argparse  # This package provides the command line options.
+import os  # This package provides access to the operating system.
+import random  # This package provides the seeded random parameters of the instances.
+import sys  # This package provides access to the module search path.
+import time  # This package provides the wall clock.
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from qbf import decomposition  # This package provides the root strategies.
+from qbf import elimination  # This package provides the elimination ordering heuristics.
+from qbf import evaluation  # This package evaluates small formulas exhaustively.
+from qbf import generator  # This package generates the random instances.
+from qbf import graphs  # This package provides the incidence graph.
+from qbf import incremental  # This package updates the new formula when clauses change.
+from qbf import pipeline  # This package provides the steps of the transformation.
+from qbf import qdimacs  # This package provides the qdimacs reader and writer.
+from qbf import simplification  # This package provides the variable elimination.
+
+RESULT_FILENAME = "result.txt"  # Change here to rename the result file.
+
+# Every instance that gives a different truth value after a step is saved in FAILURE_DIRECTORY_NAME as
+# <instance>.qdimacs together with the new formula of the step, <instance>_<step>.qdimacs (and the changed instance
+# if the step "incremental" failed). The script exits with code 1 if there is a failure.
+FAILURE_DIRECTORY_NAME = "failures"
+
+# Number of random instances and the seed of the first one (both can be changed with --instances and --seed). The
+# same seed always gives the same instances.
+INSTANCES = 2000
+SEED = 0
+
+# Parameters of the random instances: the family, the number of variables, the number of clauses per variable, the
+# number of variables per clause, the treewidth bound and the number of quantifier blocks are drawn uniformly from
+# these ranges. The instances are small, so the original formula can always be evaluated.
+FAMILIES = generator.FAMILIES
+VARIABLES = (1, 12)
+RATIO = (0.5, 2.5)
+K = (2, 4)
+WIDTH = (1, 4)
+BLOCKS = (1, 4)
+
+# Every instance gets a random heuristic and root strategy.
+HEURISTICS = elimination.HEURISTICS
+ROOT_STRATEGIES = decomposition.ROOT_STRATEGIES
+
+# The steps whose formulas are compared with the original formula. A formula with more than evaluation.MAX_VARIABLES
+# variables can not be evaluated and is skipped, except in the step "projection", which eliminates all c-variables
+# of the formula after the unit propagation by resolution and is always small enough. The step "incremental" removes
+# up to DELTA clauses of the instance and adds up to DELTA random clauses with incremental.Transformation, its new
+# formula is compared with the changed instance.
+STEPS = ["transformation", "unit propagation", "variable elimination", "output", "projection", "incremental"]
+DELTA = 2
+
+
+def get_parameters(index, seed):  # Method that draws the parameters of an instance.
+    rng = random.Random(str((seed, index)))
+    number_of_variables = rng.randint(*VARIABLES)
+    blocks = rng.randint(BLOCKS[0], min(BLOCKS[1], number_of_variables))
+    return {"family": rng.choice(FAMILIES), "variables": number_of_variables,
+            "clauses": max(1, round(rng.uniform(*RATIO) * number_of_variables)), "k": rng.randint(*K),
+            "width": rng.randint(*WIDTH), "prefix": "".join(rng.choice("ae") for _ in range(blocks)),
+            "seed": rng.randrange(1 << 30), "heuristic": rng.choice(HEURISTICS),
+            "root_strategy": rng.choice(ROOT_STRATEGIES)}
+
+
+def get_name(index, seed):  # Method that returns the name of an instance.
+    return "instance_" + str(seed) + "_" + str(index)
+
+
+def get_formulas(blocks, levels, clauses, parameters):
+    # Method that runs the transformation of an instance and returns the formulas of the steps as (blocks, levels,
+    # clauses), the formulas are copied because the steps change them.
+    graph = graphs.get_incidence_graph(clauses)
+    bags, edges, _ = pipeline.heuristic_decomposition(graph, [parameters["heuristic"]])
+    formula, _ = pipeline.special_solving(bags, edges, clauses, parameters["root_strategy"],
+                                          number_of_variables=len(levels) - 1)
+    new_blocks, new_levels = pipeline.get_prefix(blocks, levels, formula)
+    formulas = {"transformation": (new_blocks, new_levels, [list(clause) for clause in formula.clauses])}
+
+    formula = pipeline.unit_propagation(formula, pipeline.get_protected_variables(blocks, levels))
+    formulas["unit propagation"] = (new_blocks, new_levels, [list(clause) for clause in formula.clauses])
+    projected, _ = simplification.eliminate_variables(formula.clauses, formula.number_of_input_variables + 1,
+                                                      formula.number_of_variables(), bounded=False)
+    formulas["projection"] = (new_blocks, new_levels, projected)
+
+    formula, _ = pipeline.variable_elimination(formula)
+    formulas["variable elimination"] = (new_blocks, new_levels, [list(clause) for clause in formula.clauses])
+
+    # The incremental transformation starts from the same tree decomposition.
+    rng = random.Random(parameters["seed"])
+    transformation = incremental.Transformation(bags, edges, clauses, parameters["root_strategy"], len(levels) - 1)
+    removed = rng.sample(range(1, len(clauses) + 1), rng.randint(0, min(DELTA, len(clauses))))
+    added = []
+    for _ in range(rng.randint(0, DELTA)):
+        variables = rng.sample(range(1, len(levels)), rng.randint(1, min(parameters["k"], len(levels) - 1)))
+        added.append([variable if rng.random() < 0.5 else -variable for variable in variables])
+    transformation.update(added, removed)
+    changed = transformation.get_formula()
+    changed_blocks, changed_levels = pipeline.get_prefix(blocks, levels, changed)
+    formulas["incremental"] = (changed_blocks, changed_levels, changed.clauses)
+    formulas["changed instance"] = (blocks, levels, transformation.get_clauses())
+    return formula, formulas
+
+
+def check_instance(index, seed, path_output):
+    # Method that checks one instance. It returns the name, the truth value of the original formula, the steps that
+    # were compared, the steps that failed and the formulas.
+    parameters = get_parameters(index, seed)
+    blocks, levels, clauses = generator.generate(parameters["family"], parameters["variables"], parameters["clauses"],
+                                                 parameters["k"], parameters["width"], parameters["prefix"],
+                                                 parameters["seed"])
+    value = evaluation.evaluate(blocks, levels, clauses)
+    formula, formulas = get_formulas(blocks, levels, clauses, parameters)
+    changed_value = evaluation.evaluate(*formulas["changed instance"])
+
+    # The step "output" reads the file that pipeline.write_formula writes (compact numbering, empty blocks dropped).
+    pipeline.write_formula(path_output, blocks, levels, formula)
+    formulas["output"] = qdimacs.read_qdimacs_file(path_output)
+
+    checked = []
+    failed = []
+    for step in STEPS:
+        step_blocks, step_levels, step_clauses = formulas[step]
+        try:
+            step_value = evaluation.evaluate(step_blocks, step_levels, step_clauses)
+        except ValueError:  # Too many variables.
+            continue
+        checked.append(step)
+        if step_value != (changed_value if step == "incremental" else value):
+            failed.append(step)
+    return get_name(index, seed), (blocks, levels, clauses), value, checked, failed, formulas
+
+
+def save_failure(name, original, failed, formulas):  # Method that saves the formulas of a failed instance.
+    os.makedirs(FAILURE_DIRECTORY_NAME, exist_ok=True)
+    qdimacs.write_qdimacs_file(FAILURE_DIRECTORY_NAME + "/" + name + ".qdimacs", *original)
+    if "incremental" in failed:
+        failed = failed + ["changed instance"]
+    for step in failed:
+        path = FAILURE_DIRECTORY_NAME + "/" + name + "_" + step.replace(" ", "_") + ".qdimacs"
+        qdimacs.write_qdimacs_file(path, *formulas[step])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the truth values of random instances and their new formulas.")
+    parser.add_argument("--instances", type=int, default=INSTANCES, help="number of instances")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the instances")
+    options = parser.parse_args()
+
+    start = time.perf_counter()
+    path_output = "output.qdimacs"
+    values = [0, 0]
+    checked = dict((step, 0) for step in STEPS)
+    failures = []
+    try:
+        for index in range(options.instances):
+            name, original, value, checked_steps, failed, formulas = check_instance(index, options.seed, path_output)
+            values[value] += 1
+            for step in checked_steps:
+                checked[step] += 1
+            if failed:
+                save_failure(name, original, failed, formulas)
+                failures.append((name, failed))
+                print("failure of " + name + " in " + ", ".join(failed) + ".")
+    finally:
+        if os.path.exists(path_output):
+            os.remove(path_output)
+    duration = time.perf_counter() - start
+
+    with open(RESULT_FILENAME, "w") as file:
+        file.write(str(options.instances) + " instances (seed " + str(options.seed) + ") in " + format(duration, ".1f")
+                   + " s, " + format(options.instances / duration, ".1f") + " instances per second.\n")
+        file.write(str(values[1]) + " true, " + str(values[0]) + " false.\n")
+        for step in STEPS:
+            file.write(step + ": compared " + str(checked[step]) + " times.\n")
+        for name, failed in failures:
+            file.write("Failure of " + name + " in " + ", ".join(failed) + ".\n")
+        if not failures:
+            file.write("No failures.\n")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
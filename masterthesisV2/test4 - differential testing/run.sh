@@ -0,0 +1,7 @@
+#!/bin/bash
+
+# Script that runs differential.py
+
+echo "start differential.py."
+python3 differential.py "$@"
+echo "end differential.py."
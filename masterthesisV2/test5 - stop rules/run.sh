@@ -0,0 +1,7 @@
+#!/bin/bash
+
+# Script that runs stop_rules.py
+
+echo "start stop_rules.py."
+python3 stop_rules.py "$@"
+echo "end stop_rules.py."
@@ -0,0 +1,134 @@
+import os  # This package provides access to the operating system.
+import stat  # This package provides the file mode of the stand-in solver.
+import sys  # This package provides access to the module search path and the python executable.
+import tempfile  # This package provides the temporary directory of the stand-in solver and the graphs.
+import time  # This package provides the wall clock.
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from qbf import cache  # This package provides the artifact cache.
+from qbf import flowcutter  # This package provides the stop rules and the solver runner.
+from qbf import generator  # This package generates the formula of the pipeline check.
+from qbf import pipeline  # This package provides the flowcutter step of the transformation.
+
+RESULT_FILENAME = "result.txt"  # Change here to rename the result file.
+
+# The checks run a stand-in solver instead of flowcutter: it prints "c status <width>" lines at the given times
+# (seconds after its start) and its decomposition (one bag with all nodes) when it gets SIGTERM, like
+# flowcutter_pace17. A check passes if the solver was stopped between the expected time and TOLERANCE seconds later.
+# The script exits with code 1 if a check fails.
+TOLERANCE = 0.5
+
+STAND_IN_SOLVER = """import signal
+import sys
+import time
+
+SCHEDULE = {schedule}
+number_of_nodes = 0
+for line in open(sys.argv[-1]):
+    if line.startswith("p "):
+        number_of_nodes = int(line.split()[2])
+
+
+def terminate(*_):
+    sys.stdout.write("s td 1 %d %d\\n" % (number_of_nodes, number_of_nodes))
+    sys.stdout.write("b 1 " + " ".join(str(node) for node in range(1, number_of_nodes + 1)) + "\\n")
+    sys.stdout.flush()
+    sys.exit(0)
+
+
+signal.signal(signal.SIGTERM, terminate)
+start = time.monotonic()
+for at, width in SCHEDULE:
+    time.sleep(max(0, start + at - time.monotonic()))
+    sys.stdout.write("c status %d %d\\n" % (width, int(1000 * (time.monotonic() - start))))
+    sys.stdout.flush()
+while True:
+    time.sleep(0.05)
+"""
+
+# The checks of the stop rules: name, schedule of the solver, arguments of flowcutter.StopRule, number of nodes of the
+# graph and the expected time of the SIGTERM.
+CHECKS = [
+    ("time limit", [(0.1, 9)], {"time_limit": 1}, 20, 1),
+    ("time per node", [(0.1, 9)], {"time_limit": 30, "time_per_node": 0.01, "minimum_time": 0.5}, 50, 1),
+    ("time per node capped by time limit", [(0.1, 9)], {"time_limit": 1, "time_per_node": 1}, 50, 1),
+    ("plateau", [(0.1, 9), (0.2, 8), (0.3, 7)], {"time_limit": 30, "plateau_time": 0.5}, 20, 0.8),
+    ("plateau without width", [], {"time_limit": 1, "plateau_time": 0.2}, 20, 1),
+    ("target width", [(0.2, 6), (0.4, 5), (0.6, 4), (0.8, 3)], {"time_limit": 30, "target_width": 4}, 20, 0.6),
+]
+
+
+def write_solver(directory, schedule):  # Method that writes an executable stand-in solver and returns its path.
+    path = os.path.join(directory, "solver.py")
+    with open(path, "w") as file:
+        file.write("#!" + sys.executable + "\n" + STAND_IN_SOLVER.replace("{schedule}", repr(schedule)))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+def write_path_graph(path, number_of_nodes):  # Method that writes a path with number_of_nodes nodes as .gr file.
+    with open(path, "w") as file:
+        file.write("p tw " + str(number_of_nodes) + " " + str(number_of_nodes - 1) + "\n")
+        for node in range(1, number_of_nodes):
+            file.write(str(node) + " " + str(node + 1) + "\n")
+
+
+def check_stop_rule(directory, schedule, arguments, number_of_nodes):
+    # Method that runs the stand-in solver with a stop rule and returns the time until it ended.
+    path_solver = write_solver(directory, schedule)
+    path_graph = os.path.join(directory, "graph.gr")
+    write_path_graph(path_graph, number_of_nodes)
+    start = time.monotonic()
+    bags, _, width = flowcutter.get_tree_decomposition([path_solver], path_graph, flowcutter.StopRule(**arguments),
+                                                       number_of_nodes, grace_time=2)
+    if width != number_of_nodes or len(bags) != 1:
+        raise RuntimeError("unexpected decomposition of the stand-in solver")
+    return time.monotonic() - start
+
+
+def check_pipeline(directory):
+    # Method that runs pipeline.flowcutter_decompositions with a node-scaled budget twice on a small formula, the
+    # second run has to take the decomposition from the cache. It returns the times of both runs and the budget.
+    _, _, clauses = generator.generate(generator.PATH, 20, 40, 3, 4, "ae", 0)
+    path_solver = write_solver(directory, [(0.1, 9)])
+    artifact_cache = cache.Cache(os.path.join(directory, "cache"), 1 << 20)
+    number_of_nodes = 20 + len(clauses)
+    budget = flowcutter.StopRule(30, time_per_node=0.005, minimum_time=0.2).budget(number_of_nodes)
+    times = []
+    for _ in range(2):
+        start = time.monotonic()
+        decompositions = pipeline.flowcutter_decompositions(directory, clauses, artifact_cache, "stop rules",
+                                                            path_solver, 30, time_per_node=0.005, minimum_time=0.2)
+        times.append(time.monotonic() - start)
+        if len(decompositions) != 1 or len(decompositions[0][0]) != 1:
+            raise RuntimeError("unexpected decompositions of the pipeline")
+    return times, budget
+
+
+def main():
+    lines = []
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for name, schedule, arguments, number_of_nodes, expected in CHECKS:
+            duration = check_stop_rule(directory, schedule, arguments, number_of_nodes)
+            passed = expected <= duration < expected + TOLERANCE
+            failures += not passed
+            lines.append(name + ": stopped after " + format(duration, ".2f") + " s, expected "
+                         + format(expected, ".2f") + " s" + ("." if passed else ", FAILED."))
+        times, budget = check_pipeline(directory)
+        passed = budget <= times[0] < budget + TOLERANCE and times[1] < TOLERANCE
+        failures += not passed
+        lines.append("pipeline: " + format(times[0], ".2f") + " s and " + format(times[1], ".2f")
+                     + " s (cached), budget " + format(budget, ".2f") + " s" + ("." if passed else ", FAILED."))
+
+    with open(RESULT_FILENAME, "w") as file:
+        for line in lines:
+            print(line)
+            file.write(line + "\n")
+        file.write(("No failures." if not failures else str(failures) + " failures.") + "\n")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()